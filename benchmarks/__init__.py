@@ -0,0 +1,7 @@
+"""
+	Performance tests for the parts of infotools our pipelines depend on.
+	python -m benchmarks run
+	python -m benchmarks compare <baseline> <current>
+"""
+from .compare import Comparison, compare_results, load_results
+from .suite import BENCHMARKS, SIZES, run_benchmarks, save_results
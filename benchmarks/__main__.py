@@ -0,0 +1,42 @@
+import argparse
+import sys
+
+from .compare import compare_results, load_results
+from .suite import BENCHMARKS, SIZES, run_benchmarks, save_results
+
+
+def main(arguments = None) -> int:
+	parser = argparse.ArgumentParser(prog = 'python -m benchmarks', description = "Benchmarks for infotools.")
+	subparsers = parser.add_subparsers(dest = 'command', required = True)
+
+	run_parser = subparsers.add_parser('run', help = "Runs the benchmarks and saves the results for the current commit.")
+	run_parser.add_argument('--benchmarks', nargs = '+', choices = list(BENCHMARKS), default = None)
+	run_parser.add_argument('--sizes', nargs = '+', choices = list(SIZES), default = ['small', 'medium'])
+	run_parser.add_argument('--repeat', type = int, default = 5)
+	run_parser.add_argument('--output', default = None, help = "Defaults to benchmarks/results/<commit>.json")
+
+	compare_parser = subparsers.add_parser('compare', help = "Flags benchmarks that are slower than the baseline.")
+	compare_parser.add_argument('baseline', help = "A results file, or the commit the results were saved for.")
+	compare_parser.add_argument('current', help = "A results file, or the commit the results were saved for.")
+	compare_parser.add_argument('--threshold', type = float, default = 0.1, help = "Ex. 0.1 flags anything more than 10%% slower.")
+	compare_parser.add_argument('--statistic', choices = ['min', 'median', 'mean'], default = 'min')
+
+	args = parser.parse_args(arguments)
+	if args.command == 'run':
+		results = run_benchmarks(args.benchmarks, args.sizes, args.repeat)
+		for name, result in results['results'].items():
+			print(f"{name:<32}{result['min']:>12.6f}s")
+		print(f"Saved to {save_results(results, args.output)}")
+		return 0
+
+	comparisons = compare_results(load_results(args.baseline), load_results(args.current), args.threshold, args.statistic)
+	print(f"{'benchmark':<32}{'baseline':>12}{'current':>12}{'change':>10}")
+	for comparison in comparisons:
+		print(comparison)
+	regressions = [comparison for comparison in comparisons if comparison.regressed]
+	print(f"{len(regressions)} of {len(comparisons)} benchmarks are more than {args.threshold:.0%} slower.")
+	return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+	Compares two sets of benchmark results to find regressions.
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from .suite import RESULTS_FOLDER
+
+
+@dataclass
+class Comparison:
+	name: str
+	baseline: float  # seconds
+	current: float  # seconds
+	threshold: float
+
+	@property
+	def change(self) -> float:
+		""" The relative change in time. Ex. 0.25 means the benchmark is 25% slower."""
+		return self.current / self.baseline - 1 if self.baseline else 0.0
+
+	@property
+	def regressed(self) -> bool:
+		return self.change > self.threshold
+
+	def __str__(self) -> str:
+		flag = "REGRESSION" if self.regressed else ""
+		return f"{self.name:<32}{self.baseline:>12.6f}{self.current:>12.6f}{self.change:>+10.1%}  {flag}"
+
+
+def load_results(commit_or_filename: Union[str, Path]) -> Dict[str, Any]:
+	""" Loads saved results, either from a file or by the commit they were run on."""
+	filename = Path(commit_or_filename)
+	if not filename.exists():
+		filename = RESULTS_FOLDER / f"{commit_or_filename}.json"
+	return json.loads(filename.read_text(encoding = 'utf-8'))
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1,
+		statistic: str = 'min') -> List[Comparison]:
+	""" Compares every benchmark that appears in both sets of results.
+		Parameters
+		----------
+			baseline, current: Dict[str, Any]
+				Results from `run_benchmarks` or `load_results`.
+			threshold: float; default 0.1
+				Benchmarks that are more than this much slower (relative to the baseline) are regressions.
+			statistic: str; default 'min'
+				One of 'min', 'median' or 'mean'.
+	"""
+	return [
+		Comparison(name, baseline['results'][name][statistic], current['results'][name][statistic], threshold)
+		for name in baseline['results'] if name in current['results']
+	]
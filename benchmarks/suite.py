@@ -0,0 +1,167 @@
+"""
+	Times each benchmark on fixed synthetic datasets of several sizes. The datasets are generated from a fixed seed,
+	so results from different commits are directly comparable when run on the same machine.
+"""
+import datetime
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from infotools import datatools, filetools, numbertools, tabletools, timetools
+
+RESULTS_FOLDER = Path(__file__).parent / "results"
+SEED = 1729
+# The number of items, rows or pairs in each dataset. File sizes are this many kilobytes.
+SIZES = {
+	'small':  1000,
+	'medium': 10000,
+	'large':  100000
+}
+
+Benchmark = Callable[[int, Path], Callable[[], Any]]
+# Each benchmark creates its dataset and returns a function that runs the code being timed.
+BENCHMARKS: Dict[str, Benchmark] = dict()
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+	def register(func: Benchmark) -> Benchmark:
+		BENCHMARKS[name] = func
+		return func
+
+	return register
+
+
+@benchmark('human_readable')
+def benchmark_human_readable(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	values = [10 ** generator.uniform(-3, 15) for _ in range(size)]
+	return lambda: [numbertools.human_readable(value) for value in values]
+
+
+@benchmark('to_number')
+def benchmark_to_number(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	formats = ["{:.0f}", "{:,.2f}", "{:.3e}", "{:.1f}%", "n/a"]
+	values = [generator.choice(formats).format(generator.uniform(0, 1E6)) for _ in range(size)]
+	return lambda: numbertools.to_number(values)
+
+
+@benchmark('Timestamp.parse')
+def benchmark_timestamp_parse(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	start = datetime.datetime(2000, 1, 1)
+	formats = ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%d", "%m/%d/%Y %H:%M:%S", "%d %b %Y"]
+	values = [
+		(start + datetime.timedelta(seconds = generator.randrange(10 ** 9))).strftime(generator.choice(formats))
+		for _ in range(size)
+	]
+	return lambda: [timetools.Timestamp.parse(value) for value in values]
+
+
+@benchmark('Duration.to_iso')
+def benchmark_duration_to_iso(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	values = [timetools.Duration(seconds = generator.randrange(10 ** 8)) for _ in range(size)]
+	return lambda: [value.to_iso() for value in values]
+
+
+@benchmark('generate_md5')
+def benchmark_generate_md5(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	filename = folder / f"md5_{size}.bin"
+	filename.write_bytes(generator.randbytes(size * 1024))
+	return lambda: filetools.generate_md5(filename)
+
+
+@benchmark('read_table')
+def benchmark_read_table(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	filename = folder / f"table_{size}.tsv"
+	lines = ["name\tcategory\tcount\tvalue\tratio"]
+	for index in range(size):
+		category = generator.choice(['alpha', 'beta', 'gamma'])
+		lines.append(f"row{index}\t{category}\t{generator.randrange(1000)}\t{generator.uniform(0, 1E6):.4f}\t{generator.random():.6f}")
+	filename.write_text("\n".join(lines) + "\n")
+	return lambda: tabletools.read_table(filename)
+
+
+@benchmark('to_squareform')
+def benchmark_to_squareform(size: int, folder: Path) -> Callable[[], Any]:
+	generator = random.Random(SEED + size)
+	# Enough labels that the upper triangle has roughly `size` pairs.
+	count = int((2 * size) ** 0.5) + 1
+	labels = [f"label{index}" for index in range(count)]
+	values = {(left, right): generator.random() for index, left in enumerate(labels) for right in labels[index + 1:]}
+	return lambda: datatools.to_squareform(values)
+
+
+def _get_commit() -> str:
+	""" Returns the current commit, with a '-dirty' suffix if there are uncommitted changes."""
+	folder = Path(__file__).parent
+	try:
+		commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd = folder, capture_output = True, text = True, check = True).stdout.strip()
+		status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd = folder, capture_output = True, text = True, check = True).stdout
+	except (OSError, subprocess.CalledProcessError):
+		return 'unknown'
+	return f"{commit}-dirty" if status.strip() else commit
+
+
+def run_benchmarks(names: Optional[Iterable[str]] = None, sizes: Iterable[str] = ('small', 'medium'), repeat: int = 5) -> Dict[str, Any]:
+	""" Runs the benchmarks and returns the results in the format saved by `save_results`.
+		Parameters
+		----------
+			names: Iterable[str]; default None
+				The benchmarks to run. Defaults to all of them.
+			sizes: Iterable[str]; default ('small', 'medium')
+				Keys in `SIZES`.
+			repeat: int; default 5
+				The number of times each benchmark is timed. The minimum is the most stable estimate of the actual speed.
+	"""
+	names = list(BENCHMARKS) if names is None else list(names)
+	unknown = [name for name in names if name not in BENCHMARKS] + [size for size in sizes if size not in SIZES]
+	if unknown:
+		message = f"Unknown benchmarks or sizes: {unknown}"
+		raise ValueError(message)
+
+	results = dict()
+	with tempfile.TemporaryDirectory(prefix = 'benchmarks') as folder:
+		for name in names:
+			for size in sizes:
+				func = BENCHMARKS[name](SIZES[size], Path(folder))
+				func()  # Warm up any caches and lazy imports.
+				timings = list()
+				for _ in range(repeat):
+					start = time.perf_counter()
+					func()
+					timings.append(time.perf_counter() - start)
+				results[f"{name}[{size}]"] = {
+					'size':   SIZES[size],
+					'min':    min(timings),
+					'median': statistics.median(timings),
+					'mean':   statistics.mean(timings)
+				}
+	return {
+		'commit':   _get_commit(),
+		'date':     datetime.datetime.now().isoformat(timespec = 'seconds'),
+		'python':   platform.python_version(),
+		'platform': platform.platform(),
+		'repeat':   repeat,
+		'results':  results
+	}
+
+
+def save_results(results: Dict[str, Any], filename: Optional[Path] = None) -> Path:
+	""" Saves the results as json. Defaults to 'results/<commit>.json' next to this file."""
+	if filename is None:
+		filename = RESULTS_FOLDER / f"{results['commit']}.json"
+	filename = Path(filename)
+	filetools.checkdir(filename.parent)
+	with filetools.atomic_write(filename, 'w', encoding = 'utf-8') as file1:
+		json.dump(results, file1, indent = 4)
+	return filename
@@ -1,12 +1,26 @@
 # TODO: Move the scripts to a separate repo.
-from loguru import logger
+import importlib
+import sys
 
-from . import *
+from ._logging import get_logger, get_parse_counts, logger, reset_parse_counts
 
 DEBUG = False
+# The subpackages are imported the first time they're used, since most of them depend on large libraries
+# (pendulum for timetools, pandas for datatools and tabletools). loguru is also imported the first time something
+# is logged, unless it has already been imported, in which case the handlers are configured now.
+_SUBMODULES = ['accessors', 'datatools', 'filetools', 'numbertools', 'tabletools', 'timetools']
 
-if not DEBUG:
-	import sys
+if 'loguru' in sys.modules:
+	get_logger(remove_all = True)
 
-	logger.remove()
-	logger.add(sys.stderr, format = "{time} {level} {message}", filter = "my_module", level = "INFO")
+
+def __getattr__(name: str):
+	if name in _SUBMODULES:
+		# `import_module` also sets the attribute, so this only runs once per subpackage.
+		return importlib.import_module(f".{name}", __name__)
+	message = f"module '{__name__}' has no attribute '{name}'"
+	raise AttributeError(message)
+
+
+def __dir__():
+	return sorted(set(globals()) | set(_SUBMODULES))
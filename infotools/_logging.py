@@ -0,0 +1,102 @@
+"""
+	Logging for infotools. loguru takes longer to import than the rest of `infotools` combined, so it is only
+	imported once something is logged. Modules use the `logger` proxy defined here rather than `loguru.logger`.
+
+	Debug logging for hot paths: `logger.debug(f"...")` builds the message even when no handler accepts DEBUG
+	messages (the default, since only INFO and above are kept), so `debug()` checks the level first. The parse
+	strategy counters use the same check, so they cost a single comparison when debugging is off.
+	Ex.
+		logger.add(sys.stderr, level = 'DEBUG')
+		Timestamp.parse('May 6, 2019')
+		get_parse_counts() -> {'verbal': 1}
+"""
+import collections
+import math
+import sys
+from typing import Any, Counter, Dict
+
+_DEBUG = 10  # The severity of loguru's DEBUG level.
+_logger = None  # `loguru.logger`, once it has been imported and configured.
+# `logger.debug` makes the same comparison, but only after the message has been formatted by the caller.
+# loguru doesn't expose the lowest level accepted by any handler, so this relies on its internals. If they change,
+# `_get_min_level` returns 0 and every message is formatted, as if the check didn't exist.
+_core = None
+# The number of times each parsing strategy succeeded, ex. 'pendulum', 'american' or 'verbal'.
+_parse_counts: Counter = collections.Counter()
+
+
+def get_logger(remove_all: bool = False):
+	""" Imports and configures `loguru.logger` the first time it is needed. Unless `infotools.DEBUG` is set,
+		loguru's default handler is replaced with one that only keeps INFO messages and above.
+		Parameters
+		----------
+			remove_all: bool; default False
+				Whether to remove every existing handler rather than just the default one. Used when loguru was
+				imported before infotools, in which case the handlers are configured while infotools is imported.
+	"""
+	global _logger, _core
+	if _logger is None:
+		from loguru import logger
+
+		from . import DEBUG
+		if not DEBUG:
+			if remove_all:
+				logger.remove()
+			else:
+				# Handlers added after infotools was imported are kept.
+				try:
+					logger.remove(0)
+				except ValueError:
+					pass
+			logger.add(sys.stderr, format = "{time} {level} {message}", filter = "my_module", level = "INFO")
+		_core = getattr(logger, '_core', None)
+		_logger = logger
+	return _logger
+
+
+class _LazyLogger:
+	""" Stands in for `loguru.logger`, which is imported the first time one of its methods is used."""
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(get_logger(), name)
+
+	def __repr__(self) -> str:
+		return repr(get_logger())
+
+
+logger = _LazyLogger()
+
+
+def _get_min_level() -> float:
+	if _logger is None:
+		if 'loguru' not in sys.modules:
+			# Nothing can have added a handler yet.
+			return math.inf
+		get_logger()
+	return getattr(_core, 'min_level', 0)
+
+
+def is_debug_enabled() -> bool:
+	""" Whether any handler will receive DEBUG messages."""
+	return _get_min_level() <= _DEBUG
+
+
+def debug(message: str, *args: Any, **kwargs: Any):
+	""" Logs `message` formatted with `str.format(*args, **kwargs)`, but only formats it if DEBUG messages are enabled."""
+	if _get_min_level() <= _DEBUG:
+		get_logger().opt(depth = 1).debug(message, *args, **kwargs)
+
+
+def count_parse(strategy: str):
+	""" Records that `strategy` successfully parsed a value. Does nothing unless DEBUG messages are enabled."""
+	if _get_min_level() <= _DEBUG:
+		_parse_counts[strategy] += 1
+
+
+def get_parse_counts() -> Dict[str, int]:
+	""" Returns the number of values each parsing strategy handled while DEBUG messages were enabled."""
+	return dict(_parse_counts)
+
+
+def reset_parse_counts():
+	_parse_counts.clear()
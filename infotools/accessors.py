@@ -0,0 +1,192 @@
+"""
+	Registers `.infotools` accessors for pandas Series and DataFrames, which apply the numbertools and timetools
+	conversions to an entire column at once.
+	Ex.
+		df['size'].infotools.human_readable()
+		df.infotools.to_timestamp(columns = ['start', 'end'])
+	Columns with a numeric, datetime, timedelta or string dtype are converted by vectorized implementations.
+	Anything else (ex. object columns with a mix of types), along with any strings the vectorized parsers can't handle,
+	falls back to calling the scalar function on each value, which gives the same result as `Series.map`.
+	Missing values stay missing.
+	This module is imported by `datatools` and `tabletools`, so the accessors are available whenever either is.
+"""
+import math
+from typing import Any, Callable, List, Optional
+
+import numpy
+import pandas
+
+from . import numbertools
+
+# Strings that pandas parses the same way as `timetools.Duration`. Anything else, including ISO durations with years
+# or months, is parsed by `Duration` itself.
+_DURATION_PATTERN = r"^(?:P(?:\d+W)?(?:\d+D)?(?:T(?:\d+H)?(?:\d+M)?(?:\d+(?:\.\d+)?S)?)?|\d+:\d{1,2}:\d{1,2}(?:\.\d+)?)$"
+_NAT = numpy.iinfo(numpy.int64).min
+
+
+def _is_numeric(series: pandas.Series) -> bool:
+	return pandas.api.types.is_numeric_dtype(series.dtype) and not pandas.api.types.is_bool_dtype(series.dtype)
+
+
+def _is_text(series: pandas.Series) -> bool:
+	""" Whether every value that isn't missing is a string."""
+	return pandas.api.types.infer_dtype(series, skipna = True) in {'string', 'empty'}
+
+
+def _apply_scalar(series: pandas.Series, func: Callable[[Any], Any], mask: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+	""" Calls `func` on each value that isn't missing, or only the values selected by `mask`. Returns an object array
+		with `None` for every other value.
+	"""
+	if mask is None:
+		mask = series.notna().to_numpy()
+	result = numpy.full(len(series), None, dtype = object)
+	for position, value in zip(numpy.flatnonzero(mask), series[mask]):
+		result[position] = func(value)
+	return result
+
+
+def _to_objects(microseconds: numpy.ndarray, func: Callable[[int], Any]) -> numpy.ndarray:
+	""" Builds an object from each integer, skipping NaT."""
+	result = numpy.full(len(microseconds), None, dtype = object)
+	for position, value in enumerate(microseconds.tolist()):
+		if value != _NAT:
+			result[position] = func(value)
+	return result
+
+
+def _to_series(series: pandas.Series, values: numpy.ndarray) -> pandas.Series:
+	# Assigning to an object series would convert datetime and timedelta subclasses to their pandas equivalents.
+	return pandas.Series(values, index = series.index, name = series.name, dtype = object)
+
+
+@pandas.api.extensions.register_series_accessor('infotools')
+class SeriesAccessor:
+	def __init__(self, series: pandas.Series):
+		self._series = series
+
+	def to_number(self, default: Any = math.nan) -> pandas.Series:
+		""" The vectorized version of `numbertools.to_number`. Numeric columns are returned unchanged, and strings are
+			parsed with `pandas.to_numeric` after removing thousands separators. The result is a float column rather
+			than a mix of ints and floats.
+		"""
+		series = self._series
+		if _is_numeric(series):
+			return series.copy()
+		if not _is_text(series):
+			return _to_series(series, _apply_scalar(series, lambda value: numbertools.to_number(value, default)))
+
+		text = series.str.replace(',', '', regex = False).str.strip()
+		result = pandas.to_numeric(text, errors = 'coerce').astype(numpy.float64)
+		fractions = (text.str.count('/') == 1).fillna(False).astype(bool)
+		if fractions.any():
+			parts = text[fractions].str.split('/', n = 1, expand = True)
+			result[fractions] = pandas.to_numeric(parts[0], errors = 'coerce') / pandas.to_numeric(parts[1], errors = 'coerce')
+		if not pandas.isna(default):
+			# 'nan' parses to a missing value, but isn't a failure.
+			failed = result.isna() & series.notna() & ~text.str.lower().isin(['nan', '+nan', '-nan'])
+			result = result.astype(object)
+			result[failed] = default
+		return result
+
+	def human_readable(self, precision: int = 2) -> pandas.Series:
+		""" The vectorized version of `numbertools.human_readable`. The magnitude of every value is found with a single
+			binary search. Non-numeric columns are converted with `to_number` first.
+		"""
+		series = self._series if _is_numeric(self._series) else pandas.to_numeric(self.to_number(), errors = 'coerce')
+		values = series.to_numpy(dtype = numpy.float64, na_value = numpy.nan)
+		scale = numbertools.DecimalScale()
+		system = sorted(scale.system, key = lambda magnitude: magnitude.multiplier)
+		multipliers = numpy.array([magnitude.multiplier for magnitude in system], dtype = numpy.float64)
+		suffixes = numpy.array([magnitude.suffix for magnitude in system], dtype = object)
+
+		magnitudes = numpy.abs(values)
+		positions = numpy.searchsorted(multipliers, magnitudes, side = 'right') - 1
+		missing = numpy.isnan(values)
+		positions[missing | (magnitudes == 0)] = system.index(scale.get_unit_magnitude())
+		if (positions < 0).any():
+			message = f"'{magnitudes[positions < 0][0]}' does not have a defined base."
+			raise ValueError(message)
+
+		numbers = numpy.char.mod(f"%.{int(precision)}f", values / multipliers[positions]).astype(object)
+		result = pandas.Series(numbers + suffixes[positions], index = series.index, name = series.name, dtype = object)
+		result[missing] = None
+		return result
+
+	def to_timestamp(self) -> pandas.Series:
+		""" The vectorized version of `timetools.Timestamp`. Datetime columns are converted directly, and strings are
+			parsed as ISO 8601 by `pandas.to_datetime`. Strings in other formats fall back to `Timestamp.parse`.
+			As with `Timestamp`, timezones are dropped and the local time is kept.
+		"""
+		from .timetools import Timestamp
+		series = self._series
+		if pandas.api.types.is_datetime64_any_dtype(series.dtype):
+			values = series
+		elif _is_text(series):
+			try:
+				values = pandas.to_datetime(series, errors = 'coerce', format = 'ISO8601')
+			except (TypeError, ValueError):
+				# Strings with different UTC offsets can't be combined into a single column.
+				return _to_series(series, _apply_scalar(series, Timestamp.parse))
+		else:
+			return _to_series(series, _apply_scalar(series, Timestamp.parse))
+
+		if values.dt.tz is not None:
+			values = values.dt.tz_localize(None)
+		result = _to_objects(values.to_numpy(dtype = 'datetime64[us]').view(numpy.int64), Timestamp.from_epoch)
+		remaining = (values.isna() & series.notna()).to_numpy()
+		if remaining.any():
+			result[remaining] = _apply_scalar(series, Timestamp.parse, remaining)[remaining]
+		return _to_series(series, result)
+
+	def to_duration(self, unit: str = 's') -> pandas.Series:
+		""" The vectorized version of `timetools.Duration`. Timedelta columns are converted directly, numbers are
+			interpreted as a number of `unit` (which `Duration` doesn't support on its own), and ISO durations without
+			years or months as well as 'HH:MM:SS' strings are parsed by `pandas.to_timedelta`. Other strings fall back
+			to `Duration.parse`.
+		"""
+		from .timetools import Duration
+		series = self._series
+		if pandas.api.types.is_timedelta64_dtype(series.dtype):
+			values = series
+		elif _is_numeric(series):
+			values = pandas.to_timedelta(series, unit = unit)
+		elif _is_text(series):
+			matches = series.str.match(_DURATION_PATTERN).fillna(False).astype(bool)
+			values = pandas.Series(pandas.NaT, index = series.index, dtype = 'timedelta64[us]')
+			if matches.any():
+				values[matches] = pandas.to_timedelta(series[matches], errors = 'coerce')
+		else:
+			return _to_series(series, _apply_scalar(series, Duration.parse))
+
+		result = _to_objects(values.to_numpy(dtype = 'timedelta64[us]').view(numpy.int64), Duration.from_microseconds)
+		remaining = (values.isna() & series.notna()).to_numpy()
+		if remaining.any():
+			result[remaining] = _apply_scalar(series, Duration.parse, remaining)[remaining]
+		return _to_series(series, result)
+
+
+@pandas.api.extensions.register_dataframe_accessor('infotools')
+class DataFrameAccessor:
+	""" Applies the `SeriesAccessor` conversions to several columns at once. Each method returns a new dataframe."""
+
+	def __init__(self, df: pandas.DataFrame):
+		self._df = df
+
+	def _apply(self, method: str, columns: Optional[List[Any]], **kwargs) -> pandas.DataFrame:
+		df = self._df.copy()
+		for column in (df.columns if columns is None else columns):
+			df[column] = getattr(df[column].infotools, method)(**kwargs)
+		return df
+
+	def to_number(self, columns: Optional[List[Any]] = None, default: Any = math.nan) -> pandas.DataFrame:
+		""" Converts `columns` (default: every column) with `Series.infotools.to_number`."""
+		return self._apply('to_number', columns, default = default)
+
+	def human_readable(self, columns: Optional[List[Any]] = None, precision: int = 2) -> pandas.DataFrame:
+		return self._apply('human_readable', columns, precision = precision)
+
+	def to_timestamp(self, columns: Optional[List[Any]] = None) -> pandas.DataFrame:
+		return self._apply('to_timestamp', columns)
+
+	def to_duration(self, columns: Optional[List[Any]] = None, unit: str = 's') -> pandas.DataFrame:
+		return self._apply('to_duration', columns, unit = unit)
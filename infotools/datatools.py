@@ -1,8 +1,47 @@
+import functools
 import itertools
+import numbers
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 from typing import *
 
+import numpy
 import pandas
 
+from . import accessors  # Registers the `.infotools` accessors.
+
+_EMPTY_POSITIONS = numpy.empty(0, dtype = numpy.int64)
+# Set in each worker process by `pairwise`, so that the items are only sent to each process once.
+_pairwise_state: Dict[str, Any] = dict()
+Triples = Union[Mapping[Tuple[Any, Any], Any], Iterable[Tuple[Any, Any, Any]]]
+
+
+def _get_codes(labels: pandas.Index, pairs: Sequence[Tuple[Any, Any]]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	""" Converts each pair of labels into a pair of integer positions in `labels`."""
+	if not pairs:
+		empty = numpy.empty(0, dtype = numpy.intp)
+		return empty, empty
+	lefts, rights = zip(*pairs)
+	return labels.get_indexer(lefts), labels.get_indexer(rights)
+
+
+def _is_number(value: Any) -> bool:
+	# `bool` is a `numbers.Number`, but booleans are kept as python objects rather than converted to 0 and 1.
+	return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _as_array(values: Sequence[Any], default: Any) -> numpy.ndarray:
+	""" Converts the values to a numeric array when possible, and an object array otherwise."""
+	is_numeric = all(_is_number(i) for i in values)
+	if is_numeric and (default is None or _is_number(default)):
+		return numpy.asarray(values, dtype = numpy.float64 if not values else None)
+	array = numpy.empty(len(values), dtype = object)
+	array[:] = values
+	return array
+
 
 def to_squareform(pairwise_values: Dict[Tuple[str,str], Any], default:Any = None)->pandas.DataFrame:
 	"""
@@ -20,16 +59,622 @@ def to_squareform(pairwise_values: Dict[Tuple[str,str], Any], default:Any = None
 		'a'	None	'ab'	'ac'
 		'b'	'ab'	None	'bc'
 		'c'	'ac'	'bc'	None
-	"""
 
+		The labels are converted to integer positions and the values are scattered into a preallocated
+		numpy array, so numeric values produce a numeric matrix rather than a table of python objects.
+		If both `(a, b)` and `(b, a)` are present, each is used for its own cell.
+		For large or mostly-missing data, see `stream_squareform`, `to_condensed` and `to_sparse`.
+		To compute the pairwise values themselves in parallel, see `pairwise`.
+	"""
 	keys = sorted(set(itertools.chain.from_iterable(pairwise_values)))
-	_square_map = dict()
-	for left in keys:
-		series = dict()
-		for right in keys:
-			value = pairwise_values.get((left, right))
-			if value is None:
-				value = pairwise_values.get((right, left), default)
-			series[right] = value
-		_square_map[left] = series
-	return pandas.DataFrame(_square_map)
+	labels = pandas.Index(keys)
+	# `None` is treated the same as a missing pair.
+	pairs = [(key, value) for key, value in pairwise_values.items() if value is not None]
+	lefts, rights = _get_codes(labels, [key for key, _ in pairs])
+	values = _as_array([value for _, value in pairs], default)
+
+	if values.dtype == object:
+		matrix = numpy.full((len(keys), len(keys)), default, dtype = object)
+	else:
+		fill = numpy.nan if default is None else default
+		matrix = numpy.full((len(keys), len(keys)), fill, dtype = numpy.result_type(values.dtype, numpy.asarray(fill).dtype, numpy.float64))
+	# The value of `(left, right)` belongs in row `right`, column `left`, and is copied to row `left`, column `right`.
+	# The copies are written first so that a pair given in both orders keeps its own value in each cell.
+	matrix[lefts, rights] = values
+	matrix[rights, lefts] = values
+
+	if values.dtype == object:
+		# Build the table column-by-column so that pandas can infer the dtype of each column.
+		return pandas.DataFrame({key: matrix[:, index].tolist() for index, key in enumerate(keys)}, index = keys)
+	# Integer values stay integral as long as every cell is filled with an integer, either from the input or from the default.
+	integral_default = default is None or (isinstance(default, numbers.Integral) and not isinstance(default, bool))
+	if values.dtype.kind in 'iu' and integral_default and not numpy.isnan(matrix).any():
+		matrix = matrix.astype(values.dtype)
+	return pandas.DataFrame(matrix, index = keys, columns = keys)
+
+
+def _get_positions(index: pandas.Index, labels: Sequence[Any]) -> numpy.ndarray:
+	""" Converts labels to their positions in `index`. Raises a KeyError if any of the labels are missing."""
+	positions = index.get_indexer(labels)
+	if (positions == -1).any():
+		missing = [label for label, position in zip(labels, positions) if position == -1]
+		message = f"Labels not in the matrix: {missing}"
+		raise KeyError(message)
+	return positions
+
+
+def _get_condensed_offsets(size: int, rows: Any, columns: Any) -> Any:
+	""" Converts cells in the upper triangle (`rows < columns`) of a matrix to positions in the condensed vector."""
+	return size * rows - rows * (rows + 1) // 2 + columns - rows - 1
+
+
+def _is_missing(values: numpy.ndarray, default: Any) -> numpy.ndarray:
+	missing = pandas.isna(values)
+	if not pandas.isna(default):
+		missing |= values == default
+	return missing
+
+
+@dataclass
+class SquareMatrix:
+	""" A square matrix along with the labels of its rows and columns. `values` may be a `numpy.memmap`,
+		in which case only the parts of the matrix that are accessed are read into memory.
+	"""
+	labels: pandas.Index
+	values: numpy.ndarray
+	default: Any = numpy.nan  # The value of cells without a pair.
+
+	def __len__(self) -> int:
+		return len(self.labels)
+
+	def select(self, rows: Optional[Iterable[Any]] = None, columns: Optional[Iterable[Any]] = None) -> pandas.DataFrame:
+		""" Reads a block of the matrix into memory. `None` selects every row or column."""
+		rows = self.labels if rows is None else pandas.Index(rows)
+		columns = self.labels if columns is None else pandas.Index(columns)
+		block = self.values[numpy.ix_(_get_positions(self.labels, rows), _get_positions(self.labels, columns))]
+		return pandas.DataFrame(block, index = rows, columns = columns)
+
+	def to_frame(self) -> pandas.DataFrame:
+		""" Reads the entire matrix into memory."""
+		return pandas.DataFrame(numpy.asarray(self.values), index = self.labels, columns = self.labels)
+
+	def to_condensed(self) -> 'CondensedMatrix':
+		""" Keeps the upper triangle of the matrix. The matrix is read one row at a time."""
+		size = len(self)
+		values = numpy.empty(size * (size - 1) // 2, dtype = self.values.dtype)
+		start = 0
+		for row in range(size - 1):
+			end = start + size - row - 1
+			values[start:end] = self.values[row, row + 1:]
+			start = end
+		return CondensedMatrix(self.labels, values)
+
+	def to_sparse(self, format: str = 'csr', block_size: int = 1024) -> 'SparseMatrix':
+		""" Keeps the cells that aren't missing or equal to `default`. The matrix is read `block_size` rows at a time."""
+		rows, columns, values = [_EMPTY_POSITIONS], [_EMPTY_POSITIONS], [numpy.empty(0, dtype = self.values.dtype)]
+		for start in range(0, len(self), block_size):
+			block = numpy.asarray(self.values[start:start + block_size])
+			block_rows, block_columns = numpy.nonzero(~_is_missing(block, self.default))
+			rows.append(block_rows + start)
+			columns.append(block_columns)
+			values.append(block[block_rows, block_columns])
+		return SparseMatrix.from_coordinates(self.labels, numpy.concatenate(rows), numpy.concatenate(columns), numpy.concatenate(values), format)
+
+
+@dataclass
+class CondensedMatrix:
+	""" The upper triangle of a symmetric matrix as a flat vector, without the diagonal. This uses half the memory
+		of the full matrix. The cells are in the same order as `scipy.spatial.distance.squareform`:
+		(0, 1), (0, 2), ..., (0, n-1), (1, 2), ..., (n-2, n-1)
+	"""
+	labels: pandas.Index
+	values: numpy.ndarray
+
+	def __len__(self) -> int:
+		return len(self.labels)
+
+	def get(self, left: Any, right: Any, diagonal: Any = numpy.nan) -> Any:
+		""" Returns the value for a single pair of labels."""
+		row, column = sorted(_get_positions(self.labels, [left, right]))
+		if row == column:
+			return diagonal
+		return self.values[_get_condensed_offsets(len(self), row, column)]
+
+	def to_square(self, diagonal: Any = numpy.nan) -> SquareMatrix:
+		""" Expands the vector into the full matrix. `diagonal` is used for every cell on the diagonal."""
+		size = len(self)
+		matrix = numpy.full((size, size), diagonal, dtype = numpy.result_type(self.values.dtype, numpy.asarray(diagonal).dtype))
+		rows, columns = numpy.triu_indices(size, k = 1)
+		matrix[rows, columns] = self.values
+		matrix[columns, rows] = self.values
+		return SquareMatrix(self.labels, matrix)
+
+	def to_frame(self, diagonal: Any = numpy.nan) -> pandas.DataFrame:
+		return self.to_square(diagonal).to_frame()
+
+
+@dataclass
+class SparseMatrix:
+	""" A matrix where most pairs are missing. `values` is a `scipy.sparse` array, and cells that aren't stored are
+		treated as missing rather than as zero.
+	"""
+	labels: pandas.Index
+	values: Any
+
+	def __len__(self) -> int:
+		return len(self.labels)
+
+	@classmethod
+	def from_coordinates(cls, labels: pandas.Index, rows: numpy.ndarray, columns: numpy.ndarray, values: numpy.ndarray,
+			format: str = 'csr') -> 'SparseMatrix':
+		""" Builds the matrix from the position and value of each stored cell. If a cell is given more than once, the
+			last value is used. Requires scipy.
+		"""
+		import scipy.sparse
+		size = len(labels)
+		# scipy adds duplicate cells together, so drop every occurrence but the last.
+		cells = rows.astype(numpy.int64) * size + columns
+		_, last = numpy.unique(cells[::-1], return_index = True)
+		last = len(cells) - 1 - last
+		matrix = scipy.sparse.coo_array((values[last], (rows[last], columns[last])), shape = (size, size))
+		return cls(labels, matrix.asformat(format))
+
+	def to_frame(self) -> pandas.DataFrame:
+		coordinates = self.values.tocoo()
+		matrix = numpy.full(coordinates.shape, numpy.nan, dtype = numpy.result_type(coordinates.dtype, numpy.float64))
+		matrix[coordinates.row, coordinates.col] = coordinates.data
+		return pandas.DataFrame(matrix, index = self.labels, columns = self.labels)
+
+
+class _LabelEncoder:
+	""" Converts labels to integer codes. If the labels are known in advance, the codes are their positions.
+		Otherwise, each label gets the next code the first time it's seen.
+	"""
+
+	def __init__(self, labels: Optional[Iterable[Any]] = None):
+		self.index = pandas.Index(labels) if labels is not None else None
+		self.codes: Dict[Any, int] = dict()
+
+	def encode(self, labels: Sequence[Any]) -> numpy.ndarray:
+		if self.index is not None:
+			return _get_positions(self.index, labels)
+		return numpy.fromiter((self.codes.setdefault(label, len(self.codes)) for label in labels), dtype = numpy.int64, count = len(labels))
+
+	def finish(self) -> Tuple[pandas.Index, numpy.ndarray]:
+		""" Returns the labels along with the position of each code in the labels. Labels that weren't known in advance are sorted."""
+		if self.index is not None:
+			return self.index, numpy.arange(len(self.index))
+		keys = sorted(self.codes)
+		positions = numpy.empty(len(keys), dtype = numpy.int64)
+		positions[[self.codes[key] for key in keys]] = numpy.arange(len(keys))
+		return pandas.Index(keys), positions
+
+
+def _iterate_triples(pairwise_values: Triples, chunksize: int) -> Iterator[Tuple[Tuple, Tuple, Tuple]]:
+	""" Groups the triples into chunks and splits each chunk into lefts, rights and values. As in `to_squareform`,
+		values of `None` are treated as missing pairs.
+	"""
+	if isinstance(pairwise_values, Mapping):
+		pairwise_values = ((left, right, value) for (left, right), value in pairwise_values.items())
+	iterator = iter(pairwise_values)
+	while True:
+		chunk = list(itertools.islice(iterator, chunksize))
+		if not chunk: break
+		chunk = [triple for triple in chunk if triple[2] is not None]
+		if chunk:
+			yield tuple(zip(*chunk))
+
+
+def _encode_triples(pairwise_values: Triples, labels: Optional[Iterable[Any]], dtype: numpy.dtype,
+		chunksize: int) -> Tuple[pandas.Index, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+	""" Reads every triple into memory as arrays of label positions and values."""
+	encoder = _LabelEncoder(labels)
+	lefts, rights, values = [_EMPTY_POSITIONS], [_EMPTY_POSITIONS], [numpy.empty(0, dtype = dtype)]
+	for chunk_lefts, chunk_rights, chunk_values in _iterate_triples(pairwise_values, chunksize):
+		lefts.append(encoder.encode(chunk_lefts))
+		rights.append(encoder.encode(chunk_rights))
+		values.append(numpy.asarray(chunk_values, dtype = dtype))
+	labels, positions = encoder.finish()
+	return labels, positions[numpy.concatenate(lefts)], positions[numpy.concatenate(rights)], numpy.concatenate(values)
+
+
+def _get_cells(lefts: numpy.ndarray, rights: numpy.ndarray, values: numpy.ndarray, symmetric: bool) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+	""" Returns the row, column and value of each cell. As in `to_squareform`, the value for `(left, right)` is
+		stored in row `right` and column `left`. If `symmetric`, each value is immediately followed by the mirrored
+		cell, so that the later of two pairs given in both orders is used for both cells.
+	"""
+	if not symmetric:
+		return rights, lefts, values
+	rows = numpy.stack([rights, lefts], axis = 1).ravel()
+	columns = numpy.stack([lefts, rights], axis = 1).ravel()
+	return rows, columns, numpy.repeat(values, 2)
+
+
+def _open_matrix(filename: Optional[Path], size: int, dtype: numpy.dtype, default: Any) -> numpy.ndarray:
+	if not size:
+		# Empty files can't be memory-mapped.
+		return numpy.full((0, 0), default, dtype = dtype)
+	if filename is None:
+		# The file is deleted as soon as the matrix is garbage collected.
+		with tempfile.TemporaryFile() as file1:
+			matrix = numpy.memmap(file1, dtype = dtype, mode = 'w+', shape = (size, size))
+	else:
+		# Saved as a .npy file so that it can be reopened with `numpy.load(filename, mmap_mode = 'r')`.
+		matrix = numpy.lib.format.open_memmap(str(filename), mode = 'w+', dtype = dtype, shape = (size, size))
+	if default != 0:
+		# New files are already filled with zeros.
+		matrix[:] = default
+	return matrix
+
+
+def _scatter(matrix: numpy.ndarray, lefts: numpy.ndarray, rights: numpy.ndarray, values: numpy.ndarray, symmetric: bool):
+	rows, columns, values = _get_cells(lefts, rights, values, symmetric)
+	# When a cell is assigned more than once, numpy keeps the last value.
+	matrix[rows, columns] = values
+
+
+def stream_squareform(triples: Triples, filename: Optional[Union[str, Path]] = None,
+		labels: Optional[Iterable[Any]] = None, dtype: Any = numpy.float64, default: Any = numpy.nan,
+		symmetric: bool = True, chunksize: int = 2 ** 20) -> SquareMatrix:
+	""" Builds a square matrix from an iterable of `(left, right, value)` triples in a single pass, without
+		holding either the triples or the matrix in memory. The matrix is written to a memory-mapped file,
+		so matrices larger than the available memory can be built and sliced with `SquareMatrix.select`.
+		As in `to_squareform`, the value for `(left, right)` is stored in row `right` and column `left`.
+		Parameters
+		----------
+			triples: Iterable[Tuple[Any, Any, Any]]
+				Read once. Can be a generator. A dictionary in the format used by `to_squareform` also works.
+			filename: str, Path; default None
+				Where to save the matrix, as a .npy file. If `None`, a temporary file is used instead.
+			labels: Iterable[Any]; default None
+				The labels of the rows and columns, in order. If given, values are written to the matrix as
+				they are read. Otherwise, the triples are buffered on disk as integer codes until every label
+				has been seen, and the labels are sorted.
+			dtype: numpy.dtype; default numpy.float64
+			default: Any; default numpy.nan
+				The value of cells without a pair.
+			symmetric: bool; default True
+				Whether each value is also written to the mirrored cell. If a pair is given in both orders,
+				the later value is used for both cells, so set this to `False` for asymmetric data.
+			chunksize: int; default 2**20
+				The number of triples processed at a time.
+		Returns
+		-------
+			SquareMatrix
+	"""
+	dtype = numpy.dtype(dtype)
+	filename = Path(filename) if filename is not None else None
+	encoder = _LabelEncoder(labels)
+
+	if encoder.index is not None:
+		matrix = _open_matrix(filename, len(encoder.index), dtype, default)
+		for lefts, rights, values in _iterate_triples(triples, chunksize):
+			_scatter(matrix, encoder.encode(lefts), encoder.encode(rights), numpy.asarray(values, dtype = dtype), symmetric)
+		labels = encoder.index
+	else:
+		records = numpy.dtype([('left', numpy.int64), ('right', numpy.int64), ('value', dtype)])
+		with tempfile.TemporaryFile() as buffer:
+			for lefts, rights, values in _iterate_triples(triples, chunksize):
+				chunk = numpy.empty(len(values), dtype = records)
+				chunk['left'] = encoder.encode(lefts)
+				chunk['right'] = encoder.encode(rights)
+				chunk['value'] = values
+				chunk.tofile(buffer)
+
+			# The codes are in the order each label was first seen, rather than the order of the sorted labels.
+			labels, positions = encoder.finish()
+			matrix = _open_matrix(filename, len(labels), dtype, default)
+			buffer.seek(0)
+			while True:
+				chunk = numpy.fromfile(buffer, dtype = records, count = chunksize)
+				if not len(chunk): break
+				_scatter(matrix, positions[chunk['left']], positions[chunk['right']], chunk['value'], symmetric)
+
+	if isinstance(matrix, numpy.memmap):
+		matrix.flush()
+	return SquareMatrix(labels, matrix, default)
+
+
+def to_condensed(pairwise_values: Triples, labels: Optional[Iterable[Any]] = None, dtype: Any = numpy.float64,
+		default: Any = numpy.nan, chunksize: int = 2 ** 20) -> CondensedMatrix:
+	""" Builds the upper triangle of a symmetric matrix, in the order used by `scipy.spatial.distance.squareform`.
+		Parameters
+		----------
+			pairwise_values: Dict[Tuple[Any, Any], Any], Iterable[Tuple[Any, Any, Any]]
+				Either a dictionary in the format used by `to_squareform` or an iterable of `(left, right, value)` triples.
+				The order of each pair doesn't matter, and pairs of a label with itself are ignored.
+				If the same pair is given more than once, the last value is used.
+			labels: Iterable[Any]; default None
+				The labels in the order they should appear in the matrix. Defaults to every label, sorted.
+			dtype: numpy.dtype; default numpy.float64
+			default: Any; default numpy.nan
+				The value of pairs that weren't given.
+			chunksize: int; default 2**20
+				The number of triples processed at a time.
+	"""
+	dtype = numpy.dtype(dtype)
+	labels, lefts, rights, values = _encode_triples(pairwise_values, labels, dtype, chunksize)
+	size = len(labels)
+	rows, columns = numpy.minimum(lefts, rights), numpy.maximum(lefts, rights)
+	upper = rows != columns
+	rows, columns = rows[upper], columns[upper]
+	vector = numpy.full(size * (size - 1) // 2, default, dtype = dtype)
+	vector[_get_condensed_offsets(size, rows, columns)] = values[upper]
+	return CondensedMatrix(labels, vector)
+
+
+def to_sparse(pairwise_values: Triples, labels: Optional[Iterable[Any]] = None, dtype: Any = numpy.float64,
+		symmetric: bool = True, format: str = 'csr', chunksize: int = 2 ** 20) -> SparseMatrix:
+	""" Builds a sparse matrix, which only stores the pairs that were given. This is much smaller than the full matrix
+		when most pairs are missing. Requires scipy.
+		Parameters
+		----------
+			pairwise_values: Dict[Tuple[Any, Any], Any], Iterable[Tuple[Any, Any, Any]]
+				Either a dictionary in the format used by `to_squareform` or an iterable of `(left, right, value)` triples.
+			labels: Iterable[Any]; default None
+				The labels in the order they should appear in the matrix. Defaults to every label, sorted.
+			dtype: numpy.dtype; default numpy.float64
+			symmetric: bool; default True
+				Whether each value is also stored in the mirrored cell. See `stream_squareform`.
+			format: str; default 'csr'
+				Any format supported by `scipy.sparse`, such as 'coo' or 'csr'.
+			chunksize: int; default 2**20
+				The number of triples processed at a time.
+	"""
+	labels, lefts, rights, values = _encode_triples(pairwise_values, labels, numpy.dtype(dtype), chunksize)
+	rows, columns, values = _get_cells(lefts, rights, values, symmetric)
+	return SparseMatrix.from_coordinates(labels, rows, columns, values, format)
+
+
+def _get_tiles(size: int, tile_size: int, symmetric: bool) -> List[Tuple[int, int, int, int]]:
+	""" Splits the matrix into square tiles of `(row_start, row_end, column_start, column_end)`. Only tiles that
+		overlap the upper triangle are needed for symmetric matrices.
+	"""
+	starts = range(0, size, tile_size)
+	return [
+		(row, min(row + tile_size, size), column, min(column + tile_size, size))
+		for row in starts for column in starts if not symmetric or column >= row
+	]
+
+
+def _get_tile_pairs(tile: Tuple[int, int, int, int], symmetric: bool, diagonal: bool) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	""" Returns the positions of the left and right item of each pair in the tile that needs to be computed."""
+	row_start, row_end, column_start, column_end = tile
+	lefts, rights = numpy.meshgrid(numpy.arange(row_start, row_end), numpy.arange(column_start, column_end), indexing = 'ij')
+	if symmetric:
+		keep = lefts <= rights if diagonal else lefts < rights
+	else:
+		keep = numpy.full(lefts.shape, True) if diagonal else lefts != rights
+	return lefts[keep], rights[keep]
+
+
+def _compute_tile(items: Sequence[Any], func: Callable, tile: Tuple[int, int, int, int], vectorized: bool, symmetric: bool,
+		diagonal: bool) -> numpy.ndarray:
+	lefts, rights = _get_tile_pairs(tile, symmetric, diagonal)
+	row_start, row_end, column_start, column_end = tile
+	if vectorized:
+		values = numpy.asarray(func(items[row_start:row_end], items[column_start:column_end]))
+		return values[lefts - row_start, rights - column_start]
+	return numpy.array([func(items[left], items[right]) for left, right in zip(lefts, rights)])
+
+
+def _initialize_pairwise(items: Sequence[Any], func: Callable):
+	_pairwise_state['items'] = items
+	_pairwise_state['func'] = func
+
+
+def _compute_shared_tile(tile: Tuple[int, int, int, int], vectorized: bool, symmetric: bool, diagonal: bool) -> numpy.ndarray:
+	return _compute_tile(_pairwise_state['items'], _pairwise_state['func'], tile, vectorized, symmetric, diagonal)
+
+
+def _iterate_tile_values(items: Sequence[Any], func: Callable, tiles: List[Tuple[int, int, int, int]], workers: Optional[int],
+		vectorized: bool, symmetric: bool, diagonal: bool) -> Iterator[numpy.ndarray]:
+	""" Yields the values of each tile, in the same order as `tiles`."""
+	if workers == 1:
+		for tile in tiles:
+			yield _compute_tile(items, func, tile, vectorized, symmetric, diagonal)
+		return
+
+	compute = functools.partial(_compute_shared_tile, vectorized = vectorized, symmetric = symmetric, diagonal = diagonal)
+	# Send several tiles to each process at a time, while leaving enough batches to balance the load.
+	chunksize = max(1, len(tiles) // (4 * (workers or os.cpu_count() or 1)))
+	with ProcessPoolExecutor(max_workers = workers, initializer = _initialize_pairwise, initargs = (items, func)) as executor:
+		yield from executor.map(compute, tiles, chunksize = chunksize)
+
+
+def pairwise(items: Sequence[Any], func: Callable, workers: Optional[int] = None, symmetric: bool = True,
+		vectorized: bool = False, labels: Optional[Iterable[Any]] = None, output: str = 'square', diagonal: bool = False,
+		tile_size: int = 256, dtype: Any = numpy.float64, default: Any = numpy.nan,
+		filename: Optional[Union[str, Path]] = None) -> Union[SquareMatrix, CondensedMatrix]:
+	""" Applies `func` to every pair of items in a pool of processes. The matrix is split into square tiles of
+		`tile_size` items per side so that each process works on a small block of items at a time, and each tile
+		is written directly into the output as it finishes.
+		Ex. pairwise(points, scipy.spatial.distance.cdist, vectorized = True, output = 'condensed')
+		Parameters
+		----------
+			items: Sequence[Any]
+				Must support slicing when `vectorized` is `True`, such as a list or a numpy array.
+			func: Callable
+				Called as `func(left, right)` for each pair. The value is stored in row `right` and column `left`,
+				the same as in `to_squareform`. `func` and `items` must be picklable unless `workers` is 1, so `func`
+				can't be a lambda.
+			workers: int; default None
+				The number of processes to use. Defaults to the number of CPUs. If 1, the pairs are computed in this process.
+			symmetric: bool; default True
+				Whether `func(a, b) == func(b, a)`. If so, only the upper triangle is computed and mirrored.
+			vectorized: bool; default False
+				If `True`, `func` is called once per tile as `func(lefts, rights)` with two slices of `items`, and should
+				return an array of shape `(len(lefts), len(rights))`, like `scipy.spatial.distance.cdist`.
+			labels: Iterable[Any]; default None
+				The label of each item. Defaults to the items themselves, which must then be hashable, or to their
+				positions when `items` is a multi-dimensional array (ex. one row per point).
+			output: str; default 'square'
+				Either 'square' for a `SquareMatrix` or 'condensed' for a `CondensedMatrix`. Only symmetric matrices can
+				be condensed.
+			diagonal: bool; default False
+				Whether to compute `func(a, a)`. Otherwise the diagonal is filled with `default`.
+			tile_size: int; default 256
+			dtype: numpy.dtype; default numpy.float64
+			default: Any; default numpy.nan
+			filename: str, Path; default None
+				If given, the square matrix is saved to this .npy file as it's computed. See `stream_squareform`.
+	"""
+	if output not in {'square', 'condensed'}:
+		message = f"Invalid output: '{output}'. Expected 'square' or 'condensed'."
+		raise ValueError(message)
+	if output == 'condensed' and not symmetric:
+		message = "Only symmetric matrices can be condensed."
+		raise ValueError(message)
+	size = len(items)
+	if labels is None:
+		labels = pandas.RangeIndex(size) if numpy.ndim(items) > 1 else pandas.Index(items)
+	else:
+		labels = pandas.Index(labels)
+	if len(labels) != size:
+		message = f"Expected {size} labels, not {len(labels)}."
+		raise ValueError(message)
+	dtype = numpy.dtype(dtype)
+
+	if output == 'condensed':
+		result = CondensedMatrix(labels, numpy.full(size * (size - 1) // 2, default, dtype = dtype))
+	elif filename is not None:
+		result = SquareMatrix(labels, _open_matrix(Path(filename), size, dtype, default), default)
+	else:
+		result = SquareMatrix(labels, numpy.full((size, size), default, dtype = dtype), default)
+
+	tiles = _get_tiles(size, tile_size, symmetric)
+	for tile, values in zip(tiles, _iterate_tile_values(items, func, tiles, workers, vectorized, symmetric, diagonal)):
+		lefts, rights = _get_tile_pairs(tile, symmetric, diagonal)
+		values = numpy.asarray(values, dtype = dtype)
+		if output == 'condensed':
+			upper = lefts != rights
+			result.values[_get_condensed_offsets(size, lefts[upper], rights[upper])] = values[upper]
+		else:
+			_scatter(result.values, lefts, rights, values, symmetric)
+
+	if isinstance(result.values, numpy.memmap):
+		result.values.flush()
+	return result
+
+
+def _get_records(labels: pandas.Index, rows: numpy.ndarray, columns: numpy.ndarray, values: numpy.ndarray,
+		as_frame: bool) -> Union[pandas.DataFrame, Dict[str, numpy.ndarray]]:
+	# As in `to_squareform`, the value of `(left, right)` is in the row of `right` and the column of `left`.
+	records = {'left': labels.take(columns).to_numpy(), 'right': labels.take(rows).to_numpy(), 'value': values}
+	return pandas.DataFrame(records) if as_frame else records
+
+
+def _get_block_cells(start: int, length: int, size: int, diagonal: bool, symmetric: bool) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	""" Selects the cells of rows `start` to `start + length` that `from_squareform` returns, relative to `start`.
+		For symmetric matrices, this is the lower triangle, where the column (`left`) comes before the row (`right`).
+	"""
+	if symmetric:
+		return numpy.tril_indices(length, k = start - (0 if diagonal else 1), m = size)
+	rows = numpy.repeat(numpy.arange(length), size)
+	columns = numpy.tile(numpy.arange(size), length)
+	if not diagonal:
+		keep = rows + start != columns
+		rows, columns = rows[keep], columns[keep]
+	return rows, columns
+
+
+def _get_top_k(values: numpy.ndarray, size: int, top_k: int, largest: bool, diagonal: bool,
+		block_size: int) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+	""" Finds the `top_k` smallest (or largest) values in each row of a numeric matrix, reading `block_size` rows at a time."""
+	top_k = min(top_k, size)
+	rows, columns, results = [_EMPTY_POSITIONS], [_EMPTY_POSITIONS], [numpy.empty(0)]
+	for start in range(0, size, block_size):
+		block = numpy.array(values[start:start + block_size], dtype = numpy.float64)
+		if not diagonal:
+			block[numpy.arange(len(block)), numpy.arange(start, start + len(block))] = numpy.nan
+		# Missing values are always sorted last.
+		keys = numpy.where(numpy.isnan(block), numpy.inf, -block if largest else block)
+		if top_k < size:
+			# Only the selected values need to be sorted.
+			selected = numpy.argpartition(keys, top_k - 1, axis = 1)[:, :top_k]
+		else:
+			selected = numpy.broadcast_to(numpy.arange(size), block.shape)
+		order = numpy.argsort(numpy.take_along_axis(keys, selected, axis = 1), axis = 1, kind = 'stable')
+		selected = numpy.take_along_axis(selected, order, axis = 1)
+		selected_values = numpy.take_along_axis(block, selected, axis = 1).ravel()
+		keep = ~numpy.isnan(selected_values)
+		rows.append(numpy.repeat(numpy.arange(start, start + len(block)), top_k)[keep])
+		columns.append(selected.ravel()[keep])
+		results.append(selected_values[keep])
+	return numpy.concatenate(rows), numpy.concatenate(columns), numpy.concatenate(results)
+
+
+def from_squareform(matrix: Union[pandas.DataFrame, SquareMatrix, CondensedMatrix], diagonal: bool = False, dropna: bool = True,
+		symmetric: bool = True, top_k: Optional[int] = None, largest: bool = False, as_frame: bool = True,
+		block_size: int = 1024) -> Union[pandas.DataFrame, Dict[str, numpy.ndarray]]:
+	""" Converts a square matrix back into `(left, right, value)` records. This is the inverse of `to_squareform`,
+		so `left` is the column of each cell and `right` is its row. The records are ordered by `left`, then `right`.
+		By default, the matrix is assumed to be symmetric and only the pairs where `left` comes before `right` are kept.
+		Ex.
+			'a'	'b'	'c'
+		'a'	None	'ab'	'ac'
+		'b'	'ab'	None	'bc'
+		'c'	'ac'	'bc'	None
+		records:
+			left	right	value
+			'a'	'b'	'ab'
+			'a'	'c'	'ac'
+			'b'	'c'	'bc'
+		Parameters
+		----------
+			matrix: pandas.DataFrame, SquareMatrix, CondensedMatrix
+				The matrix is read `block_size` rows at a time, so memory-mapped matrices don't need to fit in memory.
+			diagonal: bool; default False
+				Whether to include the cells on the diagonal.
+			dropna: bool; default True
+				Whether to skip missing cells. For a `SquareMatrix`, cells equal to its `default` are also skipped.
+			symmetric: bool; default True
+				If False, both `(left, right)` and `(right, left)` are returned for every pair.
+			top_k: int; default None
+				If given, the `top_k` smallest values of each row (that is, for each `right`) are returned instead,
+				ordered by `right` and then by value. Missing values are always skipped. The matrix must be numeric.
+			largest: bool; default False
+				Whether `top_k` selects the largest values instead.
+			as_frame: bool; default True
+				Whether to return a dataframe or a dictionary of the 'left', 'right' and 'value' arrays.
+			block_size: int; default 1024
+	"""
+	if isinstance(matrix, CondensedMatrix):
+		if top_k is None and symmetric:
+			# The vector holds the pairs in the same order as the records.
+			lefts, rights = numpy.triu_indices(len(matrix), k = 1)
+			values = matrix.values
+			if dropna:
+				keep = ~pandas.isna(values)
+				lefts, rights, values = lefts[keep], rights[keep], values[keep]
+			return _get_records(matrix.labels, rights, lefts, values, as_frame)
+		matrix = matrix.to_square()
+
+	if isinstance(matrix, SquareMatrix):
+		labels, square, default = matrix.labels, matrix.values, matrix.default
+	else:
+		labels, square, default = matrix.index, matrix.to_numpy(), numpy.nan
+		if not labels.equals(matrix.columns):
+			message = "The matrix must have the same labels for its rows and columns."
+			raise ValueError(message)
+	size = len(labels)
+
+	if top_k is not None:
+		rows, columns, values = _get_top_k(square, size, top_k, largest, diagonal, block_size)
+		return _get_records(labels, rows, columns, values, as_frame)
+
+	rows, columns, values = [_EMPTY_POSITIONS], [_EMPTY_POSITIONS], [numpy.empty(0, dtype = square.dtype)]
+	for start in range(0, size, block_size):
+		block = numpy.asarray(square[start:start + block_size])
+		block_rows, block_columns = _get_block_cells(start, len(block), size, diagonal, symmetric)
+		block_values = block[block_rows, block_columns]
+		if dropna:
+			keep = ~_is_missing(block_values, default)
+			block_rows, block_columns, block_values = block_rows[keep], block_columns[keep], block_values[keep]
+		rows.append(block_rows + start)
+		columns.append(block_columns)
+		values.append(block_values)
+	rows, columns, values = numpy.concatenate(rows), numpy.concatenate(columns), numpy.concatenate(values)
+	# The matrix is read by row, which orders the records by `right`.
+	order = numpy.lexsort((rows, columns))
+	return _get_records(labels, rows[order], columns[order], values[order], as_frame)
@@ -1,35 +1,196 @@
 import hashlib
+import itertools
+import json
 import mimetypes
 import os
+import stat
+import tempfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple, Union
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 mimetypes.add_type('audio/aac', '.aac')
 
-from loguru import logger
+from ._logging import logger
+from .numbertools import BinaryScale
 
 Pathlike = Union[str, Path]
 
 
-def get_mimetype(filename: Pathlike) -> Tuple[str, str]:
+# Signatures used to detect the filetype from the leading bytes of a file.
+# Each entry is (offset, magic bytes, (mimetype, filetype)).
+MAGIC_SIGNATURES: List[Tuple[int, bytes, Tuple[str, str]]] = [
+	(0, b'\x1f\x8b', ('application', 'gzip')),
+	(0, b'BZh', ('application', 'x-bzip2')),
+	(0, b'\xfd7zXZ\x00', ('application', 'x-xz')),
+	(0, b'\x28\xb5\x2f\xfd', ('application', 'zstd')),
+	(0, b"7z\xbc\xaf'\x1c", ('application', 'x-7z-compressed')),
+	(0, b'PK\x03\x04', ('application', 'zip')),
+	(0, b'PK\x05\x06', ('application', 'zip')),  # Empty archive
+	(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', ('application', 'vnd.ms-excel')),  # OLE2, used by .xls
+	(0, b'PAR1', ('application', 'vnd.apache.parquet')),
+	(0, b'ARROW1', ('application', 'vnd.apache.arrow.file')),
+	(0, b'\x89HDF\r\n\x1a\n', ('application', 'x-hdf5')),
+	(0, b'\x93NUMPY', ('application', 'x-npy')),
+	(0, b'SQLite format 3\x00', ('application', 'vnd.sqlite3')),
+	(0, b'%PDF-', ('application', 'pdf')),
+	(0, b'\x80\x02', ('application', 'x-pickle')),
+	(0, b'\x80\x03', ('application', 'x-pickle')),
+	(0, b'\x80\x04', ('application', 'x-pickle')),
+	(0, b'\x80\x05', ('application', 'x-pickle')),
+	(0, b'\x89PNG\r\n\x1a\n', ('image', 'png')),
+	(0, b'\xff\xd8\xff', ('image', 'jpeg')),
+	(0, b'GIF87a', ('image', 'gif')),
+	(0, b'GIF89a', ('image', 'gif')),
+	(0, b'II*\x00', ('image', 'tiff')),
+	(0, b'MM\x00*', ('image', 'tiff')),
+	(0, b'ID3', ('audio', 'mpeg')),
+	(0, b'fLaC', ('audio', 'flac')),
+	(0, b'OggS', ('audio', 'ogg')),
+	(0, b'\xff\xf1', ('audio', 'aac')),
+	(0, b'\xff\xf9', ('audio', 'aac')),
+	(4, b'ftyp', ('video', 'mp4')),
+	(8, b'WAVE', ('audio', 'wav')),
+	(8, b'AVI ', ('video', 'x-msvideo')),
+	(257, b'ustar', ('application', 'x-tar'))
+]
+# Zip archives are containers for several office formats, which are told apart by the main part of the document.
+# The members can be stored in any order, so these are looked up in the archive's directory rather than the header.
+_ZIP_MEMBERS = [
+	('xl/workbook.xml', ('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet')),
+	('word/document.xml', ('application', 'vnd.openxmlformats-officedocument.wordprocessingml.document')),
+	('ppt/presentation.xml', ('application', 'vnd.openxmlformats-officedocument.presentationml.presentation'))
+]
+# The number of leading bytes needed to check every signature.
+SNIFF_SIZE = 512
+
+_TERMINAL = None  # Key used to mark the end of a signature in the trie.
+
+
+def _build_signature_trie(signatures: Iterable[Tuple[int, bytes, Tuple[str, str]]]) -> Dict[int, Dict]:
+	""" Compiles the signatures into one prefix trie per offset, so that every signature
+		at a given offset can be checked with a single pass over the leading bytes.
+	"""
+	tries = dict()
+	for offset, magic, mimetype in signatures:
+		node = tries.setdefault(offset, dict())
+		for byte in magic:
+			node = node.setdefault(byte, dict())
+		node[_TERMINAL] = mimetype
+	return tries
+
+
+_SIGNATURE_TRIES = _build_signature_trie(MAGIC_SIGNATURES)
+
+
+def _match_signature(header: bytes) -> Optional[Tuple[str, str]]:
+	""" Returns the mimetype of the longest signature that matches `header`."""
+	for offset, node in _SIGNATURE_TRIES.items():
+		match = None
+		for byte in header[offset:]:
+			node = node.get(byte)
+			if node is None: break
+			match = node.get(_TERMINAL, match)
+		if match:
+			return match
+	return None
+
+
+def _get_zip_mimetype(filename: Pathlike) -> Tuple[str, str]:
+	""" Checks whether a zip archive is an office document."""
+	import zipfile
+	try:
+		with zipfile.ZipFile(str(filename)) as archive:
+			members = set(archive.namelist())
+	except zipfile.BadZipFile:
+		# Ex. a truncated archive.
+		members = set()
+	for member, zip_type in _ZIP_MEMBERS:
+		if member in members:
+			return zip_type
+	return 'application', 'zip'
+
+
+def sniff_mimetype(filename: Pathlike) -> Optional[Tuple[str, str]]:
+	""" Detects the mimetype of a file from its contents rather than its extension.
+		Only the first `SNIFF_SIZE` bytes of the file are read, along with the directory of zip archives.
+		Returns
+		-------
+		mimetype, filetype
+			`None` if the file doesn't match any known signature.
+	"""
+	with open(str(filename), 'rb') as file1:
+		header = file1.read(SNIFF_SIZE)
+
+	type_mime = _match_signature(header)
+	if type_mime == ('application', 'zip'):
+		type_mime = _get_zip_mimetype(filename)
+	elif type_mime is None and header and b'\x00' not in header:
+		# Plain text. Ignore a multibyte character that was truncated by the end of the sample.
+		try:
+			header.decode('utf-8')
+			type_mime = ('text', 'plain')
+		except UnicodeDecodeError as exception:
+			if exception.start >= len(header) - 3:
+				type_mime = ('text', 'plain')
+	return type_mime
+
+
+def get_mimetype(filename: Pathlike, sniff: bool = False) -> Tuple[str, str]:
 	""" Wrapper to get the mimetype of a given file. Returns `None` if the mimetype cannot be determined.
+		Parameters
+		----------
+			filename: Pathlike
+			sniff: bool; default False
+				Whether to detect the mimetype from the file contents before falling back to the extension.
+				The extension is still used if the file doesn't exist or doesn't match a known signature.
 		Returns
 		-------
 		mimetype, filetype
 	"""
 	# Cast to Path so that we can use Path methods
 	filename = Path(filename)
+	if sniff and filename.is_file():
+		type_mime = sniff_mimetype(filename)
+		# Plain text is only a guess, so prefer a more specific type based on the extension.
+		if type_mime and type_mime != ('text', 'plain'):
+			return type_mime
+	else:
+		type_mime = None
 	# TODO: Include `folder` as a valid mimetype/filetype?
 	mtype = mimetypes.guess_type(str(filename))
 	mtype, *_ = mtype
 	if mtype:
 		type_mime = tuple(mtype.split('/')) # Cast to tuple for consistency
-	else:
+	elif type_mime is None:
 		logger.warning(f"Could not determine the mimetype of {filename}: {mtype}")
 		type_mime = 'unknown', filename.suffix
 	return type_mime
 
 
+def get_mimetypes(filenames: Iterable[Pathlike], sniff: bool = True, workers: Optional[int] = None) -> List[Tuple[str, str]]:
+	""" Gets the mimetype of many files at once. Files are read in a thread pool since
+		sniffing is dominated by I/O latency rather than CPU time.
+		Parameters
+		----------
+			filenames: Iterable[Pathlike]
+			sniff: bool; default True
+				Passed to `get_mimetype`.
+			workers: int; default None
+				The number of threads to use. Defaults to the `ThreadPoolExecutor` default.
+		Returns
+		-------
+		List[Tuple[str,str]]
+			The (mimetype, filetype) of each file, in the same order as `filenames`.
+	"""
+	with ThreadPoolExecutor(max_workers = workers) as executor:
+		return list(executor.map(lambda filename: get_mimetype(filename, sniff = sniff), filenames))
+
+
 def memory_usage(show = True, units = 'MB'):
 	""" Gets the current memory usage
 		Returns
@@ -62,9 +223,8 @@ def checkdir(path: Pathlike) -> Path:
 		Path: The path that was checked.
 	"""
 	path = Path(path)
-	# if path.is_dir() and not path.exists():
-	if path.is_dir() and not path.exists():
-		path.mkdir()
+	if not path.exists():
+		path.mkdir(parents = True)
 	return path
 
 def copyfile(source:Path, target:Path)->Path:
@@ -96,5 +256,475 @@ def generate_md5(filename: Union[str, Path], blocksize: int = 2 ** 20) -> str:
 	return m.hexdigest()
 
 
+def _iterate_files(paths: Iterable[Pathlike]) -> Iterable[Path]:
+	""" Yields every file in `paths`, recursing into any folders."""
+	for path in paths:
+		path = Path(path)
+		if path.is_dir():
+			for folder, _, filenames in os.walk(str(path)):
+				for filename in filenames:
+					yield Path(folder) / filename
+		elif path.is_file():
+			yield path
+
+
+def _generate_partial_md5(filename: Pathlike, blocksize: int) -> str:
+	""" Generates the md5sum of the first and last `blocksize` bytes of a file."""
+	m = hashlib.md5()
+	with open(str(filename), "rb") as f:
+		m.update(f.read(blocksize))
+		size = os.fstat(f.fileno()).st_size
+		if size > blocksize:
+			f.seek(max(blocksize, size - blocksize))
+			m.update(f.read(blocksize))
+	return m.hexdigest()
+
+
+def _group_by(filenames: Iterable[Path], key, workers: Optional[int] = None) -> List[List[Path]]:
+	""" Groups `filenames` by `key`, only keeping groups with more than one file."""
+	filenames = list(filenames)
+	with ThreadPoolExecutor(max_workers = workers) as executor:
+		keys = executor.map(key, filenames)
+		groups = defaultdict(list)
+		for filename, value in zip(filenames, keys):
+			groups[value].append(filename)
+	return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(paths: Iterable[Pathlike], blocksize: int = 2 ** 16, workers: Optional[int] = None) -> List[List[Path]]:
+	""" Finds files with identical contents. Files are compared in stages so that
+		only files which could be duplicates are read in full:
+			1. Files are grouped by size.
+			2. Files with the same size are grouped by the md5sum of their first and last `blocksize` bytes.
+			3. The remaining candidates are grouped by the md5sum of the entire file.
+		Parameters
+		----------
+			paths: Iterable[Pathlike]
+				The files to compare. Folders are searched recursively.
+			blocksize: int; default 2**16
+				The number of bytes to read from each end of a file in the second stage.
+			workers: int; default None
+				The number of threads used to hash files.
+		Returns
+		-------
+			List[List[Path]]
+				Each group of files that share the same contents.
+	"""
+	# Use a set in case the same file is reachable from more than one of `paths`.
+	filenames = sorted(set(_iterate_files(paths)))
+
+	sizes = {filename: filename.stat().st_size for filename in filenames}
+	groups = defaultdict(list)
+	for filename, size in sizes.items():
+		groups[size].append(filename)
+	candidates = [group for group in groups.values() if len(group) > 1]
+
+	candidates = _group_by(
+		itertools.chain.from_iterable(candidates),
+		lambda f: (sizes[f], _generate_partial_md5(f, blocksize)),
+		workers
+	)
+	# The partial md5sum already covered every byte of small files.
+	duplicates = [group for group in candidates if sizes[group[0]] <= 2 * blocksize]
+	remaining = [group for group in candidates if sizes[group[0]] > 2 * blocksize]
+
+	duplicates += _group_by(itertools.chain.from_iterable(remaining), generate_md5, workers)
+	return duplicates
+
+
+@dataclass
+class DirectoryFingerprint:
+	""" The root hash of a folder along with the files that changed since it was last fingerprinted."""
+	root: str
+	added: List[str] = field(default_factory = list)
+	removed: List[str] = field(default_factory = list)
+	modified: List[str] = field(default_factory = list)
+
+	@property
+	def changed(self) -> bool:
+		return bool(self.added or self.removed or self.modified)
+
+
+def _scan_files(folder: Path, exclude: Optional[Path] = None) -> Dict[str, os.stat_result]:
+	""" Stats every file under `folder`. Keys are posix paths relative to `folder`."""
+	result = dict()
+	pending = [(str(folder), '')]
+	while pending:
+		path, relative = pending.pop()
+		with os.scandir(path) as entries:
+			for entry in entries:
+				key = relative + entry.name
+				if entry.is_dir(follow_symlinks = False):
+					pending.append((entry.path, key + '/'))
+				elif entry.is_file() and (exclude is None or Path(entry.path) != exclude):
+					result[key] = entry.stat()
+	return result
+
+
+def _parent(key: str) -> str:
+	return key.rpartition('/')[0]
+
+
+def fingerprint_directory(folder: Pathlike, state: Optional[Pathlike] = None, workers: Optional[int] = None) -> DirectoryFingerprint:
+	""" Generates a Merkle tree of the md5sums of every file in a folder. If `state` is given, the tree
+		from the previous call is loaded from it so that only files whose size or modification time changed
+		are hashed again, and only the folders containing them are recomputed. The new tree is then saved to `state`.
+		Parameters
+		----------
+			folder: Pathlike
+				The folder to fingerprint.
+			state: Pathlike; default None
+				A json file used to store the tree between calls. It is ignored if it is inside `folder`.
+			workers: int; default None
+				The number of threads used to hash files.
+		Returns
+		-------
+			DirectoryFingerprint
+				The root hash, along with the files that were added, removed or modified since the last call.
+	"""
+	# Both paths are resolved so that a state file inside `folder` is recognized however either path is spelled.
+	folder = Path(folder).resolve()
+	state = Path(state).resolve() if state else None
+	if state and state.exists():
+		previous = json.loads(state.read_text())
+	else:
+		previous = {'files': {}, 'folders': {}}
+	previous_files: Dict[str, list] = previous['files']
+	previous_folders: Dict[str, str] = previous['folders']
+
+	stats = _scan_files(folder, exclude = state)
+	files = dict()
+	added, modified = list(), list()
+	for key, stat in stats.items():
+		record = previous_files.get(key)
+		if record is None:
+			added.append(key)
+		elif record[:2] != [stat.st_size, stat.st_mtime_ns]:
+			modified.append(key)
+		else:
+			files[key] = record
+	removed = sorted(set(previous_files) - set(stats))
+
+	stale = added + modified
+	with ThreadPoolExecutor(max_workers = workers) as executor:
+		md5sums = executor.map(lambda key: generate_md5(folder / key), stale)
+		for key, md5sum in zip(stale, md5sums):
+			files[key] = [stats[key].st_size, stats[key].st_mtime_ns, md5sum]
+
+	# Only the ancestors of a changed file need to be recomputed.
+	dirty = set()
+	for key in itertools.chain(stale, removed):
+		while key:
+			key = _parent(key)
+			dirty.add(key)
+
+	children: Dict[str, Dict[str, str]] = defaultdict(dict)
+	for key, (*_, md5sum) in files.items():
+		children[_parent(key)][key] = md5sum
+		# Make sure every intermediate folder exists in the tree, even if it only contains other folders.
+		while key:
+			key = _parent(key)
+			children.setdefault(key, dict())
+	children.setdefault('', dict())  # The root folder always exists, even if it is empty.
+
+	folders = dict()
+	# Process the deepest folders first so that every subfolder is hashed before its parent.
+	for key in sorted(children, key = lambda i: i.count('/') + bool(i), reverse = True):
+		if key not in dirty and key in previous_folders:
+			md5sum = previous_folders[key]
+		else:
+			m = hashlib.md5()
+			for child, child_md5sum in sorted(children[key].items()):
+				m.update(f"{child}\t{child_md5sum}\n".encode())
+			md5sum = m.hexdigest()
+		folders[key] = md5sum
+		if key:
+			children[_parent(key)][key + '/'] = md5sum
+
+	if state:
+		state.write_text(json.dumps({'files': files, 'folders': folders}))
+
+	return DirectoryFingerprint(folders[''], sorted(added), removed, sorted(modified))
+
+
+_binary_scale = BinaryScale()
+
+
+def _format_size(value: int, precision: int = 1) -> str:
+	""" Formats a number of bytes using the suffixes from `numbertools.BinaryScale`."""
+	magnitude = _binary_scale.get_magnitude_from_value(value)
+	return f"{value / magnitude.multiplier:.{precision}f}{magnitude.suffix}"
+
+
+@dataclass
+class DiskUsage:
+	""" The total size of a folder and everything in it."""
+	path: Path
+	apparent: int = 0  # The sum of the file sizes, in bytes.
+	allocated: int = 0  # The number of bytes actually allocated on disk.
+	files: int = 0
+	children: List['DiskUsage'] = field(default_factory = list)
+
+	def __str__(self):
+		return self.to_tree()
+
+	def to_tree(self, allocated: bool = True, precision: int = 1) -> str:
+		""" Renders the folder and its subfolders as a tree.
+			Parameters
+			----------
+				allocated: bool; default True
+					Whether to show the allocated size rather than the apparent size.
+				precision: int; default 1
+					The number of decimal places to show.
+		"""
+		lines = list()
+		self._render(lines, str(self.path), '', '', allocated, precision)
+		return "\n".join(lines)
+
+	def _render(self, lines: List[str], label: str, prefix: str, indent: str, allocated: bool, precision: int):
+		size = self.allocated if allocated else self.apparent
+		lines.append(f"{prefix}{_format_size(size, precision)}\t{label}")
+		for index, child in enumerate(self.children):
+			is_last = index == len(self.children) - 1
+			child_prefix = indent + ('└── ' if is_last else '├── ')
+			child_indent = indent + ('    ' if is_last else '│   ')
+			child._render(lines, child.path.name, child_prefix, child_indent, allocated, precision)
+
+
+def _allocated_size(stat: os.stat_result) -> int:
+	# `st_blocks` is always in units of 512 bytes, and isn't available on Windows.
+	blocks = getattr(stat, 'st_blocks', None)
+	return stat.st_size if blocks is None else blocks * 512
+
+
+def _scan_folder(path: str, inodes: Set[Tuple[int, int]], lock: threading.Lock) -> Tuple[int, int, int, List[str]]:
+	""" Sums the size of the files directly inside a folder. Files with more than one hardlink
+		are only counted the first time one of their links is seen.
+		A folder that cannot be scanned, ex. because it was removed, counts as empty.
+		Returns
+		-------
+			apparent, allocated, files, subfolders
+	"""
+	apparent = allocated = files = 0
+	subfolders = list()
+	try:
+		# The folder may have been removed after its parent was scanned.
+		stat = os.lstat(path)
+		apparent, allocated = stat.st_size, _allocated_size(stat)
+		with os.scandir(path) as entries:
+			for entry in entries:
+				if entry.is_dir(follow_symlinks = False):
+					subfolders.append(entry.path)
+					continue
+				try:
+					stat = entry.stat(follow_symlinks = False)
+				except FileNotFoundError:
+					continue
+				if stat.st_nlink > 1:
+					key = (stat.st_dev, stat.st_ino)
+					with lock:
+						if key in inodes: continue
+						inodes.add(key)
+				apparent += stat.st_size
+				allocated += _allocated_size(stat)
+				files += 1
+	except OSError as exception:
+		logger.warning(f"Could not scan {path}: {exception}")
+	return apparent, allocated, files, subfolders
+
+
+def iter_disk_usage(folder: Pathlike, depth: Optional[int] = None, workers: Optional[int] = None) -> Iterator[DiskUsage]:
+	""" Calculates the size of a folder, yielding the subtotal of each subfolder as soon as every folder
+		inside it has been scanned. Folders are scanned in parallel with `os.scandir`.
+		Parameters
+		----------
+			folder: Pathlike
+			depth: int; default None
+				Only subfolders at most `depth` levels below `folder` are yielded and kept in `DiskUsage.children`.
+				Deeper folders are still included in the totals. Set this for very large trees so that
+				memory usage does not grow with the number of folders.
+			workers: int; default None
+				The number of threads used to scan folders.
+		Yields
+		------
+			DiskUsage
+				The totals for each subfolder. `folder` itself is always yielded last.
+	"""
+	folder = Path(folder)
+	inodes, lock = set(), threading.Lock()
+	root = DiskUsage(folder)
+	# Maps the id of each folder that is still being scanned to its parent, depth and number of unfinished subfolders.
+	parents: Dict[int, Tuple[Optional[DiskUsage], int]] = {id(root): (None, 0)}
+	remaining: Dict[int, int] = dict()
+
+	executor = ThreadPoolExecutor(max_workers = workers)
+	try:
+		futures = {executor.submit(_scan_folder, str(folder), inodes, lock): root}
+		while futures:
+			done, _ = wait(futures, return_when = FIRST_COMPLETED)
+			for future in done:
+				node = futures.pop(future)
+				node.apparent, node.allocated, node.files, subfolders = future.result()
+				remaining[id(node)] = len(subfolders)
+				level = parents[id(node)][1]
+				for subfolder in sorted(subfolders):
+					child = DiskUsage(Path(subfolder))
+					parents[id(child)] = (node, level + 1)
+					futures[executor.submit(_scan_folder, subfolder, inodes, lock)] = child
+
+				# Walk up the tree, finishing every folder that has no more subfolders to scan.
+				while node is not None and remaining[id(node)] == 0:
+					parent, level = parents.pop(id(node))
+					remaining.pop(id(node))
+					node.children.sort(key = lambda i: i.path.name)
+					if depth is None or level <= depth:
+						yield node
+					if parent is not None:
+						parent.apparent += node.apparent
+						parent.allocated += node.allocated
+						parent.files += node.files
+						if depth is None or level <= depth:
+							parent.children.append(node)
+						remaining[id(parent)] -= 1
+					node = parent
+	finally:
+		executor.shutdown(wait = False, cancel_futures = True)
+
+
+def disk_usage(folder: Pathlike, depth: Optional[int] = None, workers: Optional[int] = None) -> DiskUsage:
+	""" Calculates the apparent and allocated size of a folder, similar to `du`.
+		Parameters
+		----------
+			folder: Pathlike
+			depth: int; default None
+				The number of subfolder levels to keep in the result. All levels are kept by default.
+			workers: int; default None
+				The number of threads used to scan folders.
+		Returns
+		-------
+			DiskUsage
+				Use `DiskUsage.to_tree()` or `print()` to show the result as a tree.
+	"""
+	for usage in iter_disk_usage(folder, depth, workers):
+		pass
+	return usage
+
+
+def _get_umask() -> Optional[int]:
+	""" Reads the umask of the current process without changing it, which is only possible on Linux.
+		`os.umask` can only read the value by replacing it, which affects files created by other threads in the meantime.
+	"""
+	try:
+		with open('/proc/self/status') as file1:
+			for line in file1:
+				if line.startswith('Umask:'):
+					return int(line.split()[1], 8)
+	except (OSError, ValueError, IndexError):
+		pass
+	return None
+
+
+def _fsync_folder(folder: Pathlike):
+	""" Flushes a folder's entries to disk so that a renamed file survives a crash.
+		This isn't supported on Windows, where it is skipped.
+	"""
+	if not hasattr(os, 'O_DIRECTORY'): return
+	fd = os.open(str(folder), os.O_RDONLY | os.O_DIRECTORY)
+	try:
+		os.fsync(fd)
+	finally:
+		os.close(fd)
+
+
+class AtomicWriteBatch:
+	""" Groups the folder syncs of many `atomic_write` calls, so that each folder is only synced once
+		when the batch is closed rather than once per file.
+		Ex.
+		with AtomicWriteBatch() as batch:
+			for filename, data in outputs.items():
+				with batch.open(filename) as file1:
+					file1.write(data)
+	"""
+
+	def __init__(self):
+		self.folders: Set[Path] = set()
+
+	def __enter__(self) -> 'AtomicWriteBatch':
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	def open(self, filename: Pathlike, mode: str = 'wb', **kwargs):
+		""" Same as `atomic_write`, except the folder is synced when the batch is closed."""
+		return atomic_write(filename, mode, batch = self, **kwargs)
+
+	def close(self):
+		""" Syncs every folder that a file was written to."""
+		for folder in sorted(self.folders):
+			_fsync_folder(folder)
+		self.folders.clear()
+
+
+@contextmanager
+def atomic_write(filename: Pathlike, mode: str = 'wb', buffering: int = 2 ** 20, encoding: Optional[str] = None,
+		fsync: bool = True, batch: Optional[AtomicWriteBatch] = None) -> Iterator[IO]:
+	""" Opens a file so that it is either written completely or not at all. The data is written to a
+		temporary file in the same folder, which replaces `filename` once the `with` block exits without an error.
+		Ex.
+		with atomic_write("output.tsv", 'w') as file1:
+			file1.write(text)
+		Parameters
+		----------
+			filename: Pathlike
+				The output file. Missing parent folders are created with `checkdir`.
+			mode: str; default 'wb'
+				Either a text or binary write mode.
+			buffering: int; default 2**20
+				The size of the write buffer, in bytes.
+			encoding: str; default None
+				Passed to `open()` when writing text.
+			fsync: bool; default True
+				Whether to flush the file and its folder to disk before returning. Without this the file can
+				still be lost in a crash, but it will never be left half-written.
+			batch: AtomicWriteBatch; default None
+				Defers the folder sync to the batch. Use `AtomicWriteBatch.open()` rather than passing this directly.
+		Permissions
+		-----------
+			An existing file keeps its permissions. New files get the same permissions as `open()` would give them on
+			Linux, where the umask can be read safely. Elsewhere they keep the 0o600 (owner-only) mode of `tempfile`.
+	"""
+	if 'w' not in mode:
+		message = f"atomic_write() only supports write modes, not '{mode}'"
+		raise ValueError(message)
+	filename = Path(filename)
+	folder = checkdir(filename.parent)
+
+	fd, temporary_filename = tempfile.mkstemp(dir = str(folder), prefix = f".{filename.name}.", suffix = '.tmp')
+	try:
+		with open(fd, mode, buffering = buffering, encoding = encoding) as file1:
+			yield file1
+			file1.flush()
+			if fsync:
+				os.fsync(file1.fileno())
+		if filename.exists():
+			os.chmod(temporary_filename, stat.S_IMODE(os.stat(str(filename)).st_mode))
+		else:
+			umask = _get_umask()
+			if umask is not None:
+				os.chmod(temporary_filename, 0o666 & ~umask)
+		os.replace(temporary_filename, str(filename))
+	except BaseException:
+		if os.path.exists(temporary_filename):
+			os.remove(temporary_filename)
+		raise
+
+	if fsync:
+		if batch is None:
+			_fsync_folder(folder)
+		else:
+			batch.folders.add(folder)
+
+
 if __name__ == "__main__":
 	pass
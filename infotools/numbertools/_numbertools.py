@@ -106,7 +106,7 @@ def to_number(value: Union[Any, Iterable[Any]], default: Any = math.nan) -> Unio
 	except (ValueError, TypeError):
 		converted_number = default
 
-	if not _is_null(converted_number) and math.floor(converted_number) == converted_number:
+	if not _is_null(converted_number) and math.isfinite(converted_number) and math.floor(converted_number) == converted_number:
 		converted_number = int(converted_number)
 
 	return converted_number
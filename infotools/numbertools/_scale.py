@@ -2,7 +2,7 @@ import math
 from dataclasses import dataclass, field
 from typing import *
 
-from fuzzywuzzy import process
+from .._logging import count_parse
 
 NumberType = Union[int, float]
 
@@ -62,9 +62,11 @@ class Magnitude:
 		if self.prefix == value or self.suffix == value:
 			selected_scale = True
 		else:
+			from fuzzywuzzy import process  # Slow to import, so only loaded when it's needed.
 			scale_alias, score = process.extractOne(value.lower(), self.alias)
 			if score > 90:
 				selected_scale = True
+				count_parse('fuzzy alias')
 		return selected_scale
 
 
@@ -107,12 +109,14 @@ class AbstractScale:
 			return None
 
 	def get_magnitude_from_alias(self, alias: str) -> Optional[Magnitude]:
+		from fuzzywuzzy import process  # Slow to import, so only loaded when it's needed.
 		for element in self.system:
 			if not element.alias:
 				# Don't bother with empty aliases.
 				continue
 			candidate, score = process.extractOne(alias.lower(), element.alias)
 			if score > 90:
+				count_parse('fuzzy alias')
 				return element
 		# Added to make it clear the method should return `None`
 		return None
@@ -149,7 +153,7 @@ class BinaryScale(AbstractScale):
 			Magnitude('', '', self.base ** 0, ['unit', '']),
 			Magnitude('kibi', 'K', self.base ** 1, ['thousand']),
 			Magnitude('mebi', 'M', self.base ** 2, ['million']),
-			Magnitude('gibi', 'B', self.base ** 2, ['billion']),
+			Magnitude('gibi', 'G', self.base ** 3, ['billion']),
 			Magnitude('tebi', 'T', self.base ** 4, ['trillion']),
 			Magnitude('pebi', 'P', self.base ** 5, ['quadrillion']),
 			Magnitude('exbi', 'E', self.base ** 6, ['quintillion']),
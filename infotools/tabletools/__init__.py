@@ -0,0 +1,8 @@
+from .. import accessors  # Registers the `.infotools` accessors.
+from ._cache import CacheStatistics, TableCache
+from ._dtypes import infer_dtypes, read_optimized
+from ._parallel import iter_tables, read_table_parallel, read_tables
+from ._sniff import TextFormat, sniff_format
+from ._spreadsheet import write_sheet, write_spreadsheet
+from ._tabletools import iter_table, read_table, to_spreadsheet
+from ._write import WriteStatistics, write_table
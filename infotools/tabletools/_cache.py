@@ -0,0 +1,158 @@
+"""
+	A cache of parsed tables. Each table is saved as an uncompressed Feather file, which can be
+	memory-mapped and loaded without parsing the original text or spreadsheet again.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import pandas
+
+from .. import filetools
+from .._logging import logger
+
+DEFAULT_CACHE_FOLDER = Path.home() / ".cache" / "infotools" / "tables"
+
+
+@dataclass
+class CacheStatistics:
+	""" Keeps track of how useful the cache has been."""
+	hits: int = 0
+	misses: int = 0
+	evictions: int = 0
+	load_time: float = 0.0  # Seconds spent loading tables from the cache.
+	parse_time: float = 0.0  # Seconds spent parsing tables that weren't cached.
+
+	def to_dict(self) -> Dict[str, Union[int, float]]:
+		""" Converts `self` to a dict"""
+		data = {
+			'hits':       self.hits,
+			'misses':     self.misses,
+			'evictions':  self.evictions,
+			'load_time':  self.load_time,
+			'parse_time': self.parse_time
+		}
+		return data
+
+
+class TableCache:
+	""" Saves parsed tables to a folder so that later reads can skip parsing entirely.
+		Entries are keyed by the path, size and modification time of the source file along with the
+		arguments used to read it, so a modified file is never loaded from a stale entry.
+		Requires `pyarrow`.
+		Parameters
+		----------
+			folder: Pathlike; default ~/.cache/infotools/tables
+				Where the cached tables are saved.
+			max_size: int; default 10 GiB
+				The maximum size of the cache folder, in bytes. The least recently used tables are removed
+				once the cache grows larger than this.
+	"""
+
+	def __init__(self, folder: Optional[filetools.Pathlike] = None, max_size: int = 10 * 1024 ** 3):
+		import pyarrow  # Fail early rather than on the first read.
+		self.folder = filetools.checkdir(folder or DEFAULT_CACHE_FOLDER)
+		self.max_size = max_size
+		self.statistics = CacheStatistics()
+
+	def _get_key(self, filename: Path, arguments: Dict[str, Any]) -> str:
+		stat = filename.stat()
+		key = repr((str(filename), stat.st_size, stat.st_mtime_ns, sorted(arguments.items())))
+		return hashlib.md5(key.encode()).hexdigest()
+
+	def _load(self, key: str) -> Optional[pandas.DataFrame]:
+		from pyarrow import feather
+		filename = self.folder / f"{key}.feather"
+		metadata_filename = self.folder / f"{key}.json"
+		if not (filename.exists() and metadata_filename.exists()):
+			return None
+		metadata = json.loads(metadata_filename.read_text())
+		table = feather.read_table(str(filename), memory_map = True)
+		df = table.to_pandas()
+		if metadata['index']:
+			df = df.set_index(metadata['index'])
+			df.index.names = metadata['index_names']
+		# Mark the entry as recently used.
+		os.utime(str(filename))
+		return df
+
+	def _save(self, key: str, source: Path, df: pandas.DataFrame):
+		from pyarrow import feather
+		if not all(isinstance(column, str) for column in df.columns):
+			logger.debug(f"Not caching {source} since Feather files require string column labels.")
+			return
+		index_names = list(df.index.names)
+		if isinstance(df.index, pandas.RangeIndex) and df.index.start == 0 and df.index.step == 1 and df.index.name is None:
+			index = []
+		else:
+			index = [f"__index_level_{i}__" for i in range(len(index_names))]
+			df = df.copy(deep = False)
+			df.index.names = index
+			df = df.reset_index()
+
+		metadata = {'source': str(source), 'index': index, 'index_names': index_names}
+		with filetools.atomic_write(self.folder / f"{key}.feather", fsync = False) as file1:
+			feather.write_feather(df, file1, compression = 'uncompressed')
+		with filetools.atomic_write(self.folder / f"{key}.json", 'w', fsync = False) as file1:
+			json.dump(metadata, file1)
+		self.evict()
+
+	def read(self, filename: filetools.Pathlike, reader: Callable[..., pandas.DataFrame], **kwargs) -> pandas.DataFrame:
+		""" Loads a table from the cache, or reads it with `reader(filename, **kwargs)` and caches the result."""
+		filename = Path(filename).absolute()
+		key = self._get_key(filename, kwargs)
+
+		start = time.perf_counter()
+		df = self._load(key)
+		if df is not None:
+			self.statistics.hits += 1
+			self.statistics.load_time += time.perf_counter() - start
+			return df
+
+		df = reader(filename, **kwargs)
+		self.statistics.misses += 1
+		self.statistics.parse_time += time.perf_counter() - start
+		self._save(key, filename, df)
+		return df
+
+	def invalidate(self, filename: Optional[filetools.Pathlike] = None):
+		""" Removes every cached version of a file. Clears the entire cache if `filename` is not given."""
+		source = str(Path(filename).absolute()) if filename else None
+		for metadata_filename in self.folder.glob("*.json"):
+			if source is None or json.loads(metadata_filename.read_text())['source'] == source:
+				self._remove(metadata_filename.stem)
+
+	def _remove(self, key: str):
+		for suffix in ['.feather', '.json']:
+			filename = self.folder / (key + suffix)
+			if filename.exists():
+				filename.unlink()
+
+	def size(self) -> int:
+		""" Returns the total size of the cached tables, in bytes."""
+		return sum(i.stat().st_size for i in self.folder.glob("*.feather"))
+
+	def evict(self):
+		""" Removes the least recently used tables until the cache is no larger than `max_size`."""
+		entries = [(i.stat().st_mtime, i.stat().st_size, i.stem) for i in self.folder.glob("*.feather")]
+		total = sum(size for _, size, _ in entries)
+		for _, size, key in sorted(entries):
+			if total <= self.max_size: break
+			self._remove(key)
+			total -= size
+			self.statistics.evictions += 1
+
+
+_default_cache: Optional[TableCache] = None
+
+
+def get_default_cache() -> TableCache:
+	""" Returns the cache used by `read_table(..., cache = True)`."""
+	global _default_cache
+	if _default_cache is None:
+		_default_cache = TableCache()
+	return _default_cache
@@ -0,0 +1,82 @@
+"""
+	Transparent support for compressed tables. Files are decompressed as they are read rather than to disk.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
+
+from .. import filetools
+
+COMPRESSION_EXTENSIONS = {
+	'.gz':  'gzip',
+	'.bz2': 'bz2',
+	'.xz':  'xz',
+	'.zip': 'zip'
+}
+# Maps the mimetypes detected by `filetools.sniff_mimetype` to the compression they use.
+COMPRESSION_MIMETYPES = {
+	('application', 'gzip'):    'gzip',
+	('application', 'x-bzip2'): 'bz2',
+	('application', 'x-xz'):    'xz',
+	('application', 'zip'):     'zip'
+}
+# Formats that are already zip archives, and so shouldn't be checked for compression.
+ARCHIVE_EXTENSIONS = {'.xlsx', '.xlsm'}
+# The decompressors read small blocks from the file, so add a larger buffer in front of them.
+BUFFER_SIZE = 2 ** 22
+
+
+def get_extension(file_name: Union[str, Path]) -> Tuple[str, Optional[str]]:
+	""" Splits the extensions of a file into the table format and the compression.
+		Ex. 'data.tsv.gz' -> ('.tsv', 'gzip')
+		If the last extension isn't a known compression format, the first few bytes of the file
+		are checked in case it was compressed without changing the filename.
+	"""
+	file_name = Path(file_name)
+	suffixes = file_name.suffixes
+	if suffixes and suffixes[-1] in COMPRESSION_EXTENSIONS:
+		extension = suffixes[-2] if len(suffixes) > 1 else ''
+		return extension, COMPRESSION_EXTENSIONS[suffixes[-1]]
+
+	compression = None
+	if file_name.suffix not in ARCHIVE_EXTENSIONS and file_name.is_file():
+		compression = COMPRESSION_MIMETYPES.get(filetools.sniff_mimetype(file_name))
+	return file_name.suffix, compression
+
+
+def open_compressed(file_name: Union[str, Path], compression: Optional[str], buffer_size: int = BUFFER_SIZE) -> BinaryIO:
+	""" Opens a file for reading, decompressing it on the fly.
+		Parameters
+		----------
+			file_name: str, Path
+			compression: str
+				One of 'gzip', 'bz2', 'xz' or 'zip'. Zip archives must contain exactly one file.
+				If `None`, the file is opened normally.
+			buffer_size: int; default 2**22
+				The number of decompressed bytes to buffer.
+	"""
+	file_name = str(file_name)
+	if compression is None:
+		return open(file_name, 'rb', buffering = buffer_size)
+	if compression == 'gzip':
+		raw = gzip.open(file_name, 'rb')
+	elif compression == 'bz2':
+		raw = bz2.open(file_name, 'rb')
+	elif compression == 'xz':
+		raw = lzma.open(file_name, 'rb')
+	elif compression == 'zip':
+		with zipfile.ZipFile(file_name) as archive:
+			members = [i for i in archive.infolist() if not i.is_dir()]
+			if len(members) != 1:
+				message = f"{file_name} must contain exactly one file, not {len(members)}."
+				raise ValueError(message)
+			# The member remains readable after the archive is closed.
+			raw = archive.open(members[0])
+	else:
+		message = f"Unsupported compression: '{compression}'"
+		raise ValueError(message)
+	return io.BufferedReader(raw, buffer_size = buffer_size)
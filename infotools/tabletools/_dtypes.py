@@ -0,0 +1,132 @@
+"""
+	Infers compact dtypes from a sample of a table so that wide tables can be parsed using a fraction of the memory.
+"""
+from typing import Any, Callable, Dict
+
+import numpy
+import pandas
+
+from .. import numbertools
+from .._logging import logger
+
+SAMPLE_ROWS = 10000
+INTEGER_DTYPES = [numpy.int8, numpy.int16, numpy.int32, numpy.int64]
+UNSIGNED_DTYPES = [numpy.uint8, numpy.uint16, numpy.uint32, numpy.uint64]
+
+
+def memory_usage(df: pandas.DataFrame) -> int:
+	""" Returns the number of bytes used by a dataframe, including the contents of strings."""
+	return int(df.memory_usage(deep = True).sum())
+
+
+def _get_integer_dtype(series: pandas.Series):
+	""" Returns the smallest integer dtype that can hold every value in `series`."""
+	minimum, maximum = series.min(), series.max()
+	candidates = UNSIGNED_DTYPES if minimum >= 0 else INTEGER_DTYPES
+	for dtype in candidates:
+		info = numpy.iinfo(dtype)
+		if info.min <= minimum and maximum <= info.max:
+			return dtype
+	return series.dtype
+
+
+def infer_dtypes(sample: pandas.DataFrame, max_category_ratio: float = 0.5) -> Dict[Any, Any]:
+	""" Chooses a more compact dtype for each column of a table based on a sample of its rows.
+		* Integer columns use the smallest integer dtype that fits the sampled values.
+		* String columns with few unique values are converted to `category`.
+		Float columns are left alone, since narrowing them would lose precision.
+		Parameters
+		----------
+			sample: pandas.DataFrame
+				The first few rows of the table, parsed with the default dtypes.
+			max_category_ratio: float; default 0.5
+				String columns are only converted to `category` if the number of unique values
+				is at most this fraction of the number of values.
+		Returns
+		-------
+			Dict[Any, Any]
+				Maps columns to their new dtype. Columns that should keep the default dtype are omitted.
+	"""
+	dtypes = dict()
+	for column, series in sample.items():
+		if pandas.api.types.is_bool_dtype(series):
+			continue
+		if pandas.api.types.is_integer_dtype(series) and len(series):
+			dtype = _get_integer_dtype(series)
+			if dtype != series.dtype:
+				dtypes[column] = dtype
+		elif pandas.api.types.is_object_dtype(series) or pandas.api.types.is_string_dtype(series):
+			values = series.dropna()
+			if len(values) and values.nunique() <= max_category_ratio * len(values):
+				dtypes[column] = 'category'
+	return dtypes
+
+
+def _downcast_integers(df: pandas.DataFrame, columns) -> pandas.DataFrame:
+	for column in columns:
+		values = df[column]
+		if not pandas.api.types.is_integer_dtype(values):
+			# Rows after the sample had missing or non-numeric values, so the column isn't an integer column after all.
+			continue
+		df[column] = pandas.to_numeric(values, downcast = 'unsigned' if values.min() >= 0 else 'integer')
+	return df
+
+
+def _apply_dtypes(df: pandas.DataFrame) -> pandas.DataFrame:
+	""" Converts a table that was already read in full to the dtypes chosen by `infer_dtypes`. Since every row is
+		checked, the memory used with the default dtypes is measured rather than estimated.
+	"""
+	before = memory_usage(df)
+	df = df.astype(infer_dtypes(df))
+	df.attrs['memory_usage'] = {'default': before, 'optimized': memory_usage(df), 'estimated': False}
+	return df
+
+
+def read_optimized(reader: Callable[..., pandas.DataFrame], file_name: str, sample_rows: int = SAMPLE_ROWS, **kwargs) -> pandas.DataFrame:
+	""" Reads a table with `reader(file_name, **kwargs)` using dtypes inferred from its first `sample_rows` rows.
+		The memory used by the table and the memory it would have used with the default dtypes are saved to
+		`df.attrs['memory_usage']`. Unless the sample contains the entire table, the latter is extrapolated from the
+		sample, which is marked by `'estimated': True`.
+		A caller-supplied `nrows` limits both the sample and the table.
+
+		The pandas parsers silently wrap integers that overflow the requested dtype, so narrow
+		integer dtypes are only applied while parsing when the sample contains the entire table.
+		Otherwise, integer columns are parsed normally and downcast afterwards.
+	"""
+	user_dtypes = kwargs.pop('dtype', None)
+	if user_dtypes is not None and not isinstance(user_dtypes, dict):
+		# A single dtype was given for every column, so there is nothing to optimize.
+		return reader(file_name, dtype = user_dtypes, **kwargs)
+	user_dtypes = user_dtypes or dict()
+
+	nrows = kwargs.pop('nrows', None)
+	if nrows is not None and nrows <= sample_rows:
+		sample = reader(file_name, nrows = nrows, dtype = user_dtypes or None, **kwargs)
+		is_complete = True
+	else:
+		sample = reader(file_name, nrows = sample_rows, dtype = user_dtypes or None, **kwargs)
+		is_complete = len(sample) < sample_rows
+	if nrows is not None:
+		kwargs['nrows'] = nrows
+	dtypes = {key: value for key, value in infer_dtypes(sample).items() if key not in user_dtypes}
+	if is_complete:
+		parse_dtypes = dtypes
+		integer_columns = []
+	else:
+		parse_dtypes = {key: value for key, value in dtypes.items() if value == 'category'}
+		integer_columns = [key for key, value in dtypes.items() if value != 'category']
+
+	df = reader(file_name, dtype = {**parse_dtypes, **user_dtypes} or None, **kwargs)
+	df = _downcast_integers(df, integer_columns)
+
+	after = memory_usage(df)
+	if is_complete:
+		before = memory_usage(sample)
+	else:
+		# Scale the savings from the sample up to the entire table.
+		sample_after = memory_usage(sample.astype(dtypes)) or 1
+		before = int(after * memory_usage(sample) / sample_after)
+	df.attrs['memory_usage'] = {'default': before, 'optimized': after, 'estimated': not is_complete}
+	approximate = '' if is_complete else '~'
+	logger.info(f"Optimized the memory usage of {file_name}: {approximate}{numbertools.human_readable(before)}B -> {numbertools.human_readable(after)}B")
+	return df
@@ -0,0 +1,225 @@
+"""
+	Reads tables in parallel using a pool of processes, since parsing text and spreadsheets is limited by the CPU.
+"""
+import glob
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas
+
+from .._logging import logger
+from ._compression import get_extension
+from ._dtypes import SAMPLE_ROWS
+from ._tabletools import TEXT_EXTENSIONS, _get_text_arguments, read_table
+
+Pathlike = Union[str, Path]
+
+
+def _expand_paths(pattern_or_paths: Union[Pathlike, Iterable[Pathlike]]) -> List[Path]:
+	""" Converts a glob pattern or a list of filenames into a list of Paths."""
+	if isinstance(pattern_or_paths, (str, Path)):
+		filenames = sorted(glob.glob(str(pattern_or_paths), recursive = True))
+		if not filenames:
+			message = f"'{pattern_or_paths}' does not match any files."
+			raise FileNotFoundError(message)
+		return [Path(i) for i in filenames]
+	return [Path(i) for i in pattern_or_paths]
+
+
+def _read_table(filename: Path, source: Optional[str], categories: List[str], kwargs) -> pandas.DataFrame:
+	df = read_table(filename, **kwargs)
+	if source:
+		# Every table shares the same categories so that the column stays categorical when the tables are concatenated.
+		codes = [categories.index(str(filename))] * len(df)
+		df[source] = pandas.Categorical.from_codes(codes, categories = categories)
+	return df
+
+
+def _iterate_tables(filenames: List[Path], workers: Optional[int], source: Optional[str], kwargs) -> Iterator[Tuple[int, pandas.DataFrame]]:
+	""" Yields the index of each file in `filenames` along with its table, in the order the tables finish parsing."""
+	categories = list(dict.fromkeys(str(i) for i in filenames))  # The same file may be given more than once.
+	if workers == 1:
+		for index, filename in enumerate(filenames):
+			yield index, _read_table(filename, source, categories, kwargs)
+		return
+
+	with ProcessPoolExecutor(max_workers = workers) as executor:
+		futures = {executor.submit(_read_table, filename, source, categories, kwargs): index for index, filename in enumerate(filenames)}
+		for future in as_completed(futures):
+			yield futures.pop(future), future.result()
+
+
+def iter_tables(pattern_or_paths: Union[Pathlike, Iterable[Pathlike]], workers: Optional[int] = None,
+		source: Optional[str] = None, **kwargs) -> Iterator[Tuple[Path, pandas.DataFrame]]:
+	""" Reads several tables in a pool of processes, yielding each one as soon as it has been parsed.
+		Parameters
+		----------
+			pattern_or_paths: str, Path, Iterable[Path]
+				Either a glob pattern or a list of files.
+			workers: int; default None
+				The number of processes to use. Defaults to the number of CPUs. If 1, the files are read in this process.
+			source: str; default None
+				If given, a categorical column with this name is added to each table, containing the filename.
+			**kwargs
+				Passed to `read_table`. Everything must be picklable, so `where` cannot be a lambda.
+		Yields
+		------
+			filename, table
+				In the order the tables finish parsing, not the order they were given.
+	"""
+	filenames = _expand_paths(pattern_or_paths)
+	for index, df in _iterate_tables(filenames, workers, source, kwargs):
+		yield filenames[index], df
+
+
+def read_tables(pattern_or_paths: Union[Pathlike, Iterable[Pathlike]], workers: Optional[int] = None,
+		source: Optional[str] = None, **kwargs) -> pandas.DataFrame:
+	""" Reads several tables in a pool of processes and concatenates them into a single dataframe.
+		The tables are combined in the same order as `pattern_or_paths`, or sorted by name for glob patterns.
+		Accepts the same arguments as `iter_tables`.
+	"""
+	filenames = _expand_paths(pattern_or_paths)
+	frames: List[Optional[pandas.DataFrame]] = [None] * len(filenames)
+	for index, df in _iterate_tables(filenames, workers, source, kwargs):
+		frames[index] = df
+	# `concat` copies each table into the result once. No other copies are made after the tables are parsed.
+	result = pandas.concat(frames, ignore_index = True)
+	return result
+
+
+def _find_line_boundaries(file_name: str, targets: List[int]) -> List[int]:
+	""" Moves each offset in `targets` to the start of the next line."""
+	boundaries = list()
+	with open(file_name, 'rb') as file1:
+		for target in targets:
+			file1.seek(target)
+			file1.readline()
+			boundaries.append(file1.tell())
+	return boundaries
+
+
+def _find_quoted_line_boundaries(file_name: str, targets: List[int], quotechar: bytes = b'"', blocksize: int = 2 ** 20) -> List[int]:
+	""" Moves each offset in `targets` to the start of the next line that isn't inside a quoted field.
+		Whether an offset is inside a quoted field depends on every quote before it, so the entire file is scanned.
+		Escaped quotes are doubled in csv files, so they don't change whether the parser is inside a quoted field.
+	"""
+	boundaries = list()
+	targets = sorted(targets)
+	inside_quotes = False
+	offset = 0  # The position of the current block in the file.
+	with open(file_name, 'rb') as file1:
+		while targets:
+			block = file1.read(blocksize)
+			if not block: break
+			position = 0  # Every quote before this position in the block has been counted.
+			while targets:
+				# Only line breaks after the next target are candidates.
+				start = max(position, targets[0] - offset)
+				newline = block.find(b'\n', start) if start < len(block) else -1
+				if newline == -1: break
+				inside_quotes ^= block.count(quotechar, position, newline) % 2 == 1
+				position = newline + 1
+				if not inside_quotes:
+					boundaries.append(offset + position)
+					targets.pop(0)
+			inside_quotes ^= block.count(quotechar, position) % 2 == 1
+			offset += len(block)
+	# Any remaining targets are past the last line break.
+	boundaries += [offset] * len(targets)
+	return boundaries
+
+
+def _parse_range(file_name: str, start: int, end: int, arguments: Dict) -> pandas.DataFrame:
+	with open(file_name, 'rb') as file1:
+		file1.seek(start)
+		data = file1.read(end - start)
+	return pandas.read_table(io.BytesIO(data), **arguments)
+
+
+def read_table_parallel(file_name: Union[str, Path], workers: Optional[int] = None, chunk_size: int = 2 ** 26,
+		quoted: bool = False, **kwargs) -> pandas.DataFrame:
+	""" Parses a single large delimited text file using a pool of processes. The file is split into byte ranges
+		that start at the beginning of a line, each range is parsed by a separate process, and the pieces are
+		concatenated in order.
+		Parameters
+		----------
+			file_name: str, Path
+				A .csv, .tsv, .fsv or .txt file. The first line must either be the header or, with `header = None`
+				or `names`, the first row. Compressed files are read by `read_table` in a single process instead.
+			workers: int; default None
+				The number of processes to use. Defaults to the number of CPUs.
+			chunk_size: int; default 2**26
+				The approximate size of each byte range. Smaller ranges balance the work between processes better.
+			quoted: bool; default False
+				Whether quoted fields can contain line breaks. The file then needs to be scanned
+				once to find line breaks outside of quoted fields before it can be split.
+			**kwargs
+				Passed to `pandas.read_table` for each range. Options that skip lines (`skiprows`, `skipfooter`, `nrows`
+				or a header other than the first line) would be applied to every range, so they raise a ValueError.
+		Returns
+		-------
+			pandas.DataFrame
+				The column names are taken from the header, and the dtypes are inferred from the first rows of the file
+				so that every range is parsed the same way.
+	"""
+	file_name = Path(file_name)
+	extension, compression = get_extension(file_name)
+	if extension not in TEXT_EXTENSIONS:
+		message = f"{file_name} is not a delimited text file."
+		raise NameError(message)
+	unsupported = [key for key in ['skiprows', 'skipfooter', 'nrows'] if key in kwargs]
+	if kwargs.get('header', 0) not in (0, None, 'infer'):
+		unsupported.append('header')
+	if unsupported:
+		message = f"read_table_parallel() can't split a table read with {unsupported}. Use read_table() instead."
+		raise ValueError(message)
+	if compression:
+		logger.warning(f"{file_name} is compressed, so it can't be split into byte ranges. Reading it in a single process.")
+		return read_table(file_name, **kwargs)
+	file_name = str(file_name.absolute())
+	arguments = _get_text_arguments(file_name, extension, compression, kwargs)
+
+	sample = pandas.read_table(file_name, nrows = SAMPLE_ROWS, **arguments)
+	# As with pandas, giving `names` without `header` means that the file doesn't have a header.
+	header = arguments.get('header', 'infer')
+	has_header = header is not None and not (header == 'infer' and 'names' in arguments)
+	header_arguments = {key: value for key, value in arguments.items() if key not in {'usecols', 'dtype'}}
+	names = list(pandas.read_table(file_name, nrows = 0 if has_header else 1, **header_arguments).columns)
+	# Integer columns are left out since they may contain missing values in later ranges, and columns that are
+	# entirely missing in the sample since their dtype is only a guess.
+	dtypes = {
+		column: dtype for column, dtype in sample.dtypes.items()
+		if not pandas.api.types.is_integer_dtype(dtype) and not pandas.api.types.is_bool_dtype(dtype)
+		and sample[column].notna().any()
+	}
+	dtypes = {**dtypes, **(arguments.get('dtype') or {})}
+	range_arguments = {**arguments, 'header': None, 'names': names, 'dtype': dtypes}
+
+	with open(file_name, 'rb') as file1:
+		if has_header:
+			file1.readline()
+		start = file1.tell()
+		size = os.fstat(file1.fileno()).st_size
+	targets = list(range(start + chunk_size, size, chunk_size))
+	if quoted:
+		quotechar = arguments.get('quotechar', '"').encode()
+		boundaries = _find_quoted_line_boundaries(file_name, targets, quotechar)
+	else:
+		boundaries = _find_line_boundaries(file_name, targets)
+	boundaries = sorted(set([start] + boundaries + [size]))
+	ranges = list(zip(boundaries[:-1], boundaries[1:]))
+
+	if not ranges:
+		return sample
+	with ProcessPoolExecutor(max_workers = workers) as executor:
+		futures = [executor.submit(_parse_range, file_name, start, end, range_arguments) for start, end in ranges]
+		frames = [future.result() for future in futures]
+	df = pandas.concat(frames, ignore_index = 'index_col' not in arguments)
+	# Ranges parse the columns without a forced dtype independently, so their pieces may not share a dtype.
+	for column in df.columns[df.dtypes == object]:
+		if column not in dtypes:
+			df[column] = df[column].infer_objects()
+	return df
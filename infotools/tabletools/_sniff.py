@@ -0,0 +1,83 @@
+"""
+	Detects the format of delimited text files from a small sample of their contents.
+"""
+import codecs
+import csv
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from ._compression import open_compressed
+
+SAMPLE_SIZE = 2 ** 16
+DELIMITERS = ',\t;|'
+
+
+@dataclass(frozen = True)
+class TextFormat:
+	""" The format of a delimited text file."""
+	delimiter: str
+	quotechar: str
+	header: bool
+	encoding: str
+
+
+def _detect_encoding(sample: bytes) -> str:
+	if sample.startswith(codecs.BOM_UTF8):
+		return 'utf-8-sig'
+	if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+		return 'utf-16'
+	try:
+		sample.decode('utf-8')
+	except UnicodeDecodeError as exception:
+		# The sample may end partway through a multibyte character.
+		if exception.start < len(sample) - 3:
+			return 'latin-1'
+	return 'utf-8'
+
+
+@functools.lru_cache(maxsize = 256)
+def _sniff(file_name: str, size: int, mtime: int, compression: Optional[str], sample_size: int, expected_delimiter: Optional[str]) -> TextFormat:
+	# `size` and `mtime` are only used so that modified files aren't read from the cache.
+	with open_compressed(file_name, compression, buffer_size = sample_size) as file1:
+		sample = file1.read(sample_size)
+	encoding = _detect_encoding(sample)
+	text = sample.decode(encoding, errors = 'ignore')
+	if len(sample) == sample_size and '\n' in text:
+		# Only use complete lines.
+		text = text[:text.rindex('\n')]
+
+	sniffer = csv.Sniffer()
+	try:
+		if expected_delimiter and expected_delimiter in text.split('\n', 1)[0]:
+			dialect = sniffer.sniff(text, delimiters = expected_delimiter)
+		else:
+			dialect = sniffer.sniff(text, delimiters = DELIMITERS)
+		delimiter, quotechar = dialect.delimiter, dialect.quotechar
+	except csv.Error:
+		# The table may only have a single column.
+		delimiter, quotechar = expected_delimiter or ',', '"'
+	try:
+		header = sniffer.has_header(text)
+	except csv.Error:
+		header = True
+	return TextFormat(delimiter, quotechar, header, encoding)
+
+
+def sniff_format(file_name: Union[str, Path], compression: Optional[str] = None, sample_size: int = SAMPLE_SIZE,
+		expected_delimiter: Optional[str] = None) -> TextFormat:
+	""" Infers the delimiter, quote character, header and encoding of a delimited text file using only the first
+		`sample_size` bytes. Results are cached until the file is modified.
+		Parameters
+		----------
+			file_name: str, Path
+			compression: str; default None
+				See `open_compressed`.
+			sample_size: int; default 2**16
+			expected_delimiter: str; default None
+				The delimiter implied by the extension. It is used as long as it appears in the first line.
+	"""
+	file_name = Path(file_name).absolute()
+	stat = file_name.stat()
+	return _sniff(str(file_name), stat.st_size, stat.st_mtime_ns, compression, sample_size, expected_delimiter)
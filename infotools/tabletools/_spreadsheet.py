@@ -0,0 +1,213 @@
+"""
+	A streaming .xlsx writer. Each sheet is serialized to a temporary file one chunk at a time, so memory usage
+	doesn't depend on the number of rows, and independent sheets can be serialized in separate processes
+	before they are assembled into the final workbook.
+"""
+import datetime
+import math
+import numbers
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from xml.sax.saxutils import escape
+
+import numpy
+import pandas
+
+SheetData = Union[pandas.DataFrame, Iterable[pandas.DataFrame]]
+
+# Characters that aren't allowed in XML 1.0 documents.
+_ILLEGAL_CHARACTERS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Excel stores dates as the number of days since this date.
+_EPOCH = datetime.datetime(1899, 12, 30)
+# Indices into the cell formats defined in `_STYLES`.
+_DATETIME_STYLE = 1
+_DATE_STYLE = 2
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+{sheets}
+</Types>"""
+_CONTENT_TYPE_SHEET = """<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>"""
+
+_ROOT_RELATIONSHIPS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>{sheets}</sheets>
+</workbook>"""
+_WORKBOOK_SHEET = """<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>"""
+
+_WORKBOOK_RELATIONSHIPS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{sheets}
+<Relationship Id="rId{styles}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+_WORKBOOK_RELATIONSHIP_SHEET = """<Relationship Id="rId{index}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{index}.xml"/>"""
+
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="3">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_SHEET_START = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>"""
+_SHEET_END = """</sheetData></worksheet>"""
+
+
+def _column_letter(index: int) -> str:
+	""" Converts a 0-based column index to an Excel column label. Ex. 0 -> 'A', 27 -> 'AB'"""
+	letters = ''
+	index += 1
+	while index:
+		index, remainder = divmod(index - 1, 26)
+		letters = chr(65 + remainder) + letters
+	return letters
+
+
+def _format_cell(reference: str, value) -> str:
+	""" Converts a value to the xml for a single cell. Returns an empty string for missing values."""
+	if value is None or value is pandas.NaT:
+		return ''
+	if isinstance(value, (bool, numpy.bool_)):
+		return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+	if isinstance(value, numbers.Integral):
+		return f'<c r="{reference}"><v>{int(value)}</v></c>'
+	if isinstance(value, numbers.Real):
+		value = float(value)
+		if math.isnan(value):
+			return ''
+		if not math.isinf(value):
+			return f'<c r="{reference}"><v>{value!r}</v></c>'
+		# Excel doesn't support infinite values, so save them as text.
+	elif isinstance(value, datetime.datetime):
+		days = (value.replace(tzinfo = None) - _EPOCH).total_seconds() / 86400
+		return f'<c r="{reference}" s="{_DATETIME_STYLE}"><v>{days!r}</v></c>'
+	elif isinstance(value, datetime.date):
+		days = (value - _EPOCH.date()).days
+		return f'<c r="{reference}" s="{_DATE_STYLE}"><v>{days}</v></c>'
+	text = escape(_ILLEGAL_CHARACTERS.sub('', str(value)))
+	return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _format_row(row_number: int, letters: List[str], values: Iterable) -> str:
+	cells = "".join(_format_cell(f"{letter}{row_number}", value) for letter, value in zip(letters, values))
+	return f'<row r="{row_number}">{cells}</row>'
+
+
+def _iterate_chunks(data: SheetData) -> Iterator[pandas.DataFrame]:
+	if isinstance(data, pandas.DataFrame):
+		# Serialize large tables in pieces to limit the size of the intermediate strings.
+		for start in range(0, max(len(data), 1), 10000):
+			yield data.iloc[start:start + 10000]
+	else:
+		yield from data
+
+
+def write_sheet(data: SheetData, filename: Union[str, Path], index: bool = False) -> Path:
+	""" Serializes the worksheet xml for a table, one chunk at a time.
+		Parameters
+		----------
+			data: pandas.DataFrame, Iterable[pandas.DataFrame]
+				Either a single table or an iterable of chunks. Every chunk must have the same columns.
+			filename: str, Path
+				Where to write the xml.
+			index: bool; default False
+				Whether to include the index.
+	"""
+	filename = Path(filename)
+	row_number = 1
+	letters = None
+	with filename.open('w', encoding = 'utf-8', buffering = 2 ** 20) as file1:
+		file1.write(_SHEET_START)
+		for chunk in _iterate_chunks(data):
+			if index:
+				chunk = chunk.reset_index()
+			if letters is None:
+				letters = [_column_letter(i) for i in range(len(chunk.columns))]
+				file1.write(_format_row(row_number, letters, chunk.columns))
+				row_number += 1
+			lines = list()
+			for values in chunk.itertuples(index = False, name = None):
+				lines.append(_format_row(row_number, letters, values))
+				row_number += 1
+			file1.write("".join(lines))
+		file1.write(_SHEET_END)
+	return filename
+
+
+def write_spreadsheet(tables: Dict[str, Optional[SheetData]], filename: Union[str, Path], workers: Optional[int] = 1,
+		index: bool = False) -> Path:
+	""" Saves several tables as an .xlsx workbook without holding the serialized workbook in memory.
+		Parameters
+		----------
+			tables: Dict[str, pandas.DataFrame | Iterable[pandas.DataFrame]]
+				A mapping of sheet names to either dataframes or iterables of dataframe chunks, such as the
+				output of `iter_table`. Sheets that are `None` are skipped.
+			filename: str, Path
+				The output file.
+			workers: int; default 1
+				The number of processes used to serialize sheets given as dataframes. Sheets given as iterables
+				can't be sent to another process, so they are always serialized in this process.
+			index: bool; default False
+				Whether to include the index of each table.
+		Returns
+		-------
+		Path: The output filename
+	"""
+	filename = Path(filename)
+	tables = {name: data for name, data in tables.items() if data is not None}
+	folder = Path(tempfile.mkdtemp(prefix = 'spreadsheet'))
+	try:
+		sheets = {name: folder / f"sheet{number}.xml" for number, name in enumerate(tables, start = 1)}
+		if workers == 1:
+			for name, data in tables.items():
+				write_sheet(data, sheets[name], index)
+		else:
+			with ProcessPoolExecutor(max_workers = workers) as executor:
+				futures = [
+					executor.submit(write_sheet, data, sheets[name], index)
+					for name, data in tables.items() if isinstance(data, pandas.DataFrame)
+				]
+				for name, data in tables.items():
+					if not isinstance(data, pandas.DataFrame):
+						write_sheet(data, sheets[name], index)
+				for future in futures:
+					future.result()
+
+		sheet_numbers = range(1, len(sheets) + 1)
+		workbook_sheets = [_WORKBOOK_SHEET.format(name = escape(name, {'"': '&quot;'}), index = number) for number, name in zip(sheet_numbers, sheets)]
+		with zipfile.ZipFile(str(filename), 'w', compression = zipfile.ZIP_DEFLATED) as archive:
+			archive.writestr('[Content_Types].xml', _CONTENT_TYPES.format(sheets = "\n".join(_CONTENT_TYPE_SHEET.format(index = i) for i in sheet_numbers)))
+			archive.writestr('_rels/.rels', _ROOT_RELATIONSHIPS)
+			archive.writestr('xl/workbook.xml', _WORKBOOK.format(sheets = "".join(workbook_sheets)))
+			archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELATIONSHIPS.format(
+				sheets = "\n".join(_WORKBOOK_RELATIONSHIP_SHEET.format(index = i) for i in sheet_numbers),
+				styles = len(sheets) + 1
+			))
+			archive.writestr('xl/styles.xml', _STYLES)
+			for number, sheet in zip(sheet_numbers, sheets.values()):
+				archive.write(str(sheet), f'xl/worksheets/sheet{number}.xml')
+	finally:
+		shutil.rmtree(str(folder), ignore_errors = True)
+	return filename
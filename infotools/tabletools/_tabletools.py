@@ -0,0 +1,316 @@
+import functools
+import itertools
+import re
+from pathlib import Path
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Set, Union
+
+import pandas
+
+from .._logging import logger
+from ._cache import TableCache, get_default_cache
+from ._compression import get_extension, open_compressed
+from ._dtypes import _apply_dtypes, read_optimized
+from ._sniff import sniff_format
+from ._spreadsheet import write_spreadsheet
+
+EXCEL_EXTENSIONS = {'.xls', '.xlsx', '.xlsm'}  # .xlsm is not a typo.
+TEXT_EXTENSIONS = {'.csv', '.tsv', '.fsv', '.txt'}
+BINARY_EXTENSIONS = {'.parquet', '.feather'}  # Both require pyarrow.
+Predicate = Union[str, Callable[[pandas.DataFrame], pandas.Series]]
+default_args = {
+	'.csv': {'delimiter': ','},
+	'.tsv': {'delimiter': '\t'}
+}
+
+
+def _get_text_arguments(file_name: str, extension: str, compression: Optional[str], kwargs: Dict) -> Dict:
+	""" Fills in any parser arguments that weren't given by sniffing the start of the file.
+		Extensions that imply a delimiter (.csv and .tsv) are parsed the same way as `pandas.read_table` with that
+		delimiter and the default quoting. The sniffed delimiter is only used when the implied one doesn't appear in
+		the header, and the sniffed encoding when the file isn't UTF-8. The header is only sniffed for extensions
+		that don't imply a delimiter, since the other formats conventionally include one.
+		Nothing is sniffed if the caller gives the delimiter, quote character or encoding.
+	"""
+	arguments = dict(kwargs)
+	if 'sheetname' in arguments: arguments.pop('sheetname')
+	expected_delimiter = default_args.get(extension, {}).get('delimiter')
+	if any(key in arguments for key in ['sep', 'delimiter', 'quotechar', 'encoding']):
+		if expected_delimiter is not None and 'sep' not in arguments and 'delimiter' not in arguments:
+			arguments['delimiter'] = expected_delimiter
+		return arguments
+
+	text_format = sniff_format(file_name, compression, expected_delimiter = expected_delimiter)
+	arguments['delimiter'] = text_format.delimiter
+	if text_format.encoding != 'utf-8':
+		arguments['encoding'] = text_format.encoding
+	if expected_delimiter is None:
+		if text_format.quotechar != '"':
+			arguments['quotechar'] = text_format.quotechar
+		if 'header' not in arguments and 'names' not in arguments and not text_format.header:
+			arguments['header'] = None
+	return arguments
+
+
+def _read_file(reader: Callable[..., pandas.DataFrame], file_name: str, compression: Optional[str] = None, **kwargs) -> pandas.DataFrame:
+	""" Calls `reader` with either the filename or, for compressed files, a stream of the decompressed data."""
+	if compression is None:
+		return reader(file_name, **kwargs)
+	with open_compressed(file_name, compression) as file1:
+		return reader(file1, **kwargs)
+
+
+def _read_binary(file_name: str, extension: str, compression: Optional[str], columns: Optional[List[str]],
+		extra_columns: Collection[str] = (), **kwargs) -> pandas.DataFrame:
+	""" Reads a .parquet or .feather file. Only the selected columns are loaded from disk, unless `extra_columns` is given."""
+	reader = pandas.read_parquet if extension == '.parquet' else pandas.read_feather
+	if columns is not None and not extra_columns:
+		kwargs['columns'] = list(columns)
+	df = _read_file(reader, file_name, compression, **kwargs)
+	return df if columns is None else df[_select_columns(df.columns, columns, extra_columns)]
+
+
+def _select_columns(available: Collection[str], columns: List[str], extra_columns: Collection[str]) -> List[str]:
+	""" Returns `columns` followed by any of `extra_columns` that are in `available`."""
+	return list(columns) + [column for column in available if column in extra_columns and column not in columns]
+
+
+def _get_query_columns(where: str) -> Set[str]:
+	""" Returns every name that a `DataFrame.query()` string could refer to. Names that aren't columns of
+		the table (ex. keywords, functions or the contents of string literals) are included as well.
+	"""
+	return {quoted or name for quoted, name in re.findall(r"`([^`]+)`|([^\W\d]\w*)", where)}
+
+
+def _concatenate(chunks: Iterator[pandas.DataFrame], columns: Optional[List[str]]) -> pandas.DataFrame:
+	""" Combines the filtered chunks of a table. If every row was filtered out, the columns keep their dtypes."""
+	empty = None
+	selected = list()
+	for chunk in chunks:
+		if len(chunk):
+			selected.append(chunk)
+		elif empty is None:
+			empty = chunk.iloc[0:0]
+	if selected:
+		return pandas.concat(selected)
+	return empty if empty is not None else pandas.DataFrame(columns = columns)
+
+
+def read_table(file_name: Union[str, Path], chunksize: Optional[int] = None, cache: Union[bool, TableCache] = False,
+		optimize_memory: bool = False, columns: Optional[List[str]] = None, where: Optional[Predicate] = None, **kwargs):
+	""" Reads the table and returns a dataframe. This is basically just a short script that lets
+		users import data without having to worry about filetype.
+		If `chunksize` is given, returns an iterator over dataframes with at most `chunksize` rows instead.
+		See `iter_table`.
+		If `cache` is True or a `TableCache`, the parsed table is cached so that later calls with the same
+		file and arguments load it without parsing the file again. Ignored when `chunksize` is given.
+		If `optimize_memory` is True, text and Excel tables are parsed with compact dtypes inferred from
+		a sample of the table. See `tabletools.read_optimized`. Integer columns in tables longer than the sample are still
+		parsed as int64 and narrowed afterwards, so this doesn't reduce the peak memory used by them. When `where` is given, the dtypes are instead
+		inferred from the selected rows once they have been read.
+		If `columns` is given, only those columns are parsed, in the given order.
+		If `where` is given, only the rows it selects are kept. It can be a `DataFrame.query()` string or a function that
+		returns a boolean mask, and is applied to each chunk as the file is read so that the rest of the table is never held in memory.
+		Only query strings can be combined with `cache`, since a function can't be part of the cache key.
+		`where` can refer to any column of the table, not only the selected ones.
+		Compressed tables (ex. .csv.gz, .tsv.bz2, .txt.xz, .csv.zip) are decompressed as they are read. If the extension
+		doesn't mention the compression, it is detected from the first few bytes of the file.
+		.parquet and .feather files are read with pyarrow, and already store compact dtypes.
+	"""
+	if chunksize is not None:
+		return iter_table(file_name, chunksize, columns = columns, where = where, **kwargs)
+	if cache is True:
+		try:
+			cache = get_default_cache()
+		except ImportError:
+			logger.warning("The table cache requires pyarrow. Reading the table without it.")
+			cache = False
+	if cache:
+		if callable(where):
+			message = "A `where` function can't be part of the cache key. Use a query string or disable the cache."
+			raise ValueError(message)
+		# Pass the options along so that they are part of the cache key.
+		return cache.read(file_name, read_table, optimize_memory = optimize_memory, columns = columns, where = where, **kwargs)
+
+	if where is not None:
+		df = _concatenate(iter_table(file_name, columns = columns, where = where, **kwargs), columns)
+		return _apply_dtypes(df) if optimize_memory else df
+
+	file_name = Path(file_name)
+	extension, compression = get_extension(file_name)
+
+	# arguments = self._cleanArguments(extension, arguments)
+	file_name = str(file_name.absolute())
+	if extension in EXCEL_EXTENSIONS:
+		reader, arguments = pandas.read_excel, dict(kwargs)
+	elif extension in TEXT_EXTENSIONS:
+		reader, arguments = pandas.read_table, _get_text_arguments(file_name, extension, compression, kwargs)
+	elif extension == '.pkl':
+		df = _read_file(pandas.read_pickle, file_name, compression)
+		return df if columns is None else df[list(columns)]
+	elif extension in BINARY_EXTENSIONS:
+		return _read_binary(file_name, extension, compression, columns, **kwargs)
+	else:
+		raise NameError("{} does not have a valid extension!".format(file_name))
+	reader = functools.partial(_read_file, reader, compression = compression)
+
+	if columns is not None:
+		arguments['usecols'] = list(columns)
+	if optimize_memory:
+		df = read_optimized(reader, file_name, **arguments)
+	else:
+		df = reader(file_name, **arguments)
+	if columns is not None:
+		# `usecols` ignores the order of the columns.
+		df = df[list(columns)]
+	return df
+
+
+def _iterate_slices(df: pandas.DataFrame, chunksize: int) -> Iterator[pandas.DataFrame]:
+	for start in range(0, len(df), chunksize):
+		yield df.iloc[start:start + chunksize]
+
+
+def _iterate_workbook(file_name: str, chunksize: int, columns: Optional[List[str]] = None,
+		extra_columns: Collection[str] = (), sheet_name: Union[str, int] = 0) -> Iterator[pandas.DataFrame]:
+	""" Streams the rows of an .xlsx or .xlsm sheet with openpyxl's read-only mode, which doesn't
+		load the entire workbook into memory. The first row is used as the header, and only the cells in
+		`columns` and `extra_columns` are kept.
+	"""
+	import openpyxl
+	workbook = openpyxl.load_workbook(file_name, read_only = True, data_only = True)
+	try:
+		if isinstance(sheet_name, int):
+			sheet = workbook.worksheets[sheet_name]
+		else:
+			sheet = workbook[sheet_name]
+		rows = sheet.iter_rows(values_only = True)
+		header = next(rows, None)
+		if header is None: return
+		if columns is None:
+			columns = header
+			positions = None
+		else:
+			missing = [column for column in columns if column not in header]
+			if missing:
+				message = f"Usecols do not match columns, columns expected but not found: {missing}"
+				raise ValueError(message)
+			columns = _select_columns(header, columns, extra_columns)
+			positions = [header.index(column) for column in columns]
+		start = 0
+		while True:
+			chunk = list(itertools.islice(rows, chunksize))
+			if not chunk: break
+			if positions is not None:
+				chunk = [[row[position] for position in positions] for row in chunk]
+			# Number the rows the same way as the other formats.
+			index = pandas.RangeIndex(start, start + len(chunk))
+			start += len(chunk)
+			yield pandas.DataFrame(chunk, columns = columns, index = index)
+	finally:
+		workbook.close()
+
+
+def _get_usecols(columns: List[str], extra_columns: Collection[str]) -> Union[List[str], Callable[[str], bool]]:
+	""" `usecols` for `pandas.read_table` and `pandas.read_excel`. A list makes pandas raise an error for missing columns,
+		so it is only used when there are no optional columns.
+	"""
+	if not extra_columns:
+		return list(columns)
+	return lambda column: column in columns or column in extra_columns
+
+
+def _iterate_chunks(file_name: Union[str, Path], chunksize: int, columns: Optional[List[str]] = None,
+		extra_columns: Collection[str] = (), **kwargs) -> Iterator[pandas.DataFrame]:
+	""" Reads the table in chunks. If `columns` is given, only those columns and any of `extra_columns` in the table are read."""
+	file_name = Path(file_name)
+	extension, compression = get_extension(file_name)
+	file_name = str(file_name.absolute())
+
+	if extension in TEXT_EXTENSIONS:
+		arguments = _get_text_arguments(file_name, extension, compression, kwargs)
+		if columns is not None:
+			arguments['usecols'] = _get_usecols(columns, extra_columns)
+		if compression is None:
+			with pandas.read_table(file_name, chunksize = chunksize, **arguments) as reader:
+				yield from reader
+		else:
+			with open_compressed(file_name, compression) as file1, pandas.read_table(file1, chunksize = chunksize, **arguments) as reader:
+				yield from reader
+	elif extension in EXCEL_EXTENSIONS:
+		if extension != '.xls' and compression is None and set(kwargs) <= {'sheet_name'}:
+			yield from _iterate_workbook(file_name, chunksize, columns, extra_columns, **kwargs)
+		else:
+			if columns is not None:
+				kwargs['usecols'] = _get_usecols(columns, extra_columns)
+			yield from _iterate_slices(_read_file(pandas.read_excel, file_name, compression, **kwargs), chunksize)
+	elif extension == '.pkl':
+		yield from _iterate_slices(_read_file(pandas.read_pickle, file_name, compression), chunksize)
+	elif extension in BINARY_EXTENSIONS:
+		yield from _iterate_slices(_read_binary(file_name, extension, compression, columns, extra_columns, **kwargs), chunksize)
+	else:
+		raise NameError("{} does not have a valid extension!".format(file_name))
+
+
+def iter_table(file_name: Union[str, Path], chunksize: int = 100000, columns: Optional[List[str]] = None,
+		where: Optional[Predicate] = None, **kwargs) -> Iterator[pandas.DataFrame]:
+	""" Reads a table in chunks of at most `chunksize` rows, so that files larger than the available memory
+		can be processed. Accepts the same filetypes and keyword arguments as `read_table`.
+		* Delimited text files are parsed incrementally.
+		* .xlsx and .xlsm sheets are streamed row-by-row when no keyword arguments other than `sheet_name` are given.
+			Otherwise, and for .xls files, the sheet is read in full and then split into chunks.
+		* Pickled dataframes, .parquet and .feather files are always loaded in full and then split into chunks.
+		`columns` and `where` are applied to each chunk as it is read. See `read_table`.
+	"""
+	if columns is None or where is None:
+		read_columns, extra_columns = columns, ()
+	elif isinstance(where, str):
+		# Also read the columns that only the query refers to.
+		read_columns, extra_columns = columns, _get_query_columns(where)
+	else:
+		# There's no way to tell which columns a function uses.
+		read_columns, extra_columns = None, ()
+
+	for chunk in _iterate_chunks(file_name, chunksize, read_columns, extra_columns, **kwargs):
+		if isinstance(where, str):
+			chunk = chunk.query(where)
+		elif where is not None:
+			chunk = chunk[where(chunk)]
+		if columns is not None:
+			chunk = chunk[list(columns)]
+		yield chunk
+
+
+def to_spreadsheet(tables: Dict[str, pandas.DataFrame], filename: Path, streaming: bool = False, workers: Optional[int] = 1) -> Path:
+	"""
+		Saves the table as an Excel spreadsheet, where multiple tables can be given..
+	Parameters
+	----------
+	tables: Dict[str,pandas.DataFrame]
+		A mapping of sheet names to dataframes. Sheets may also be iterables of dataframe chunks, which are
+		always written in streaming mode.
+
+	filename: str, pathlib.Path
+		The output file.
+
+	streaming: bool; default False
+		Whether to write the sheets with `write_spreadsheet`, which uses a constant amount of memory
+		regardless of the number of rows, rather than with `pandas.ExcelWriter`.
+
+	workers: int; default 1
+		The number of processes used to serialize sheets in streaming mode.
+
+	Returns
+	-------
+	Path: The output filename
+	"""
+	include_index = False
+	if streaming or not all(df is None or isinstance(df, pandas.DataFrame) for df in tables.values()):
+		return write_spreadsheet(tables, filename, workers = workers, index = include_index)
+
+	# python 3.5 or 3.6 made all dicts ordered by default, so the sheets will be ordered in the same order they were defined in `tables`
+	# The file is saved when the writer is closed. Otherwise color_table_cells will not be able to load the file
+	with pandas.ExcelWriter(str(filename)) as writer:
+		for sheet_label, df in tables.items():
+			if df is None: continue
+			df.to_excel(writer, sheet_name = sheet_label, index = include_index)
+	return filename
@@ -0,0 +1,155 @@
+"""
+	Writes tables to any of the formats supported by `read_table`, choosing the format from the extension.
+"""
+import bz2
+import contextlib
+import gzip
+import lzma
+import pickle
+import queue
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import pandas
+
+from .. import filetools, numbertools
+from .._logging import logger
+from ._compression import COMPRESSION_EXTENSIONS
+from ._tabletools import BINARY_EXTENSIONS
+
+DELIMITERS = {
+	'.csv': ',',
+	'.tsv': '\t'
+}
+
+
+@dataclass
+class WriteStatistics:
+	""" Describes how quickly a table was written."""
+	filename: Path
+	rows: int
+	size: int  # The size of the output file, in bytes.
+	seconds: float
+
+	@property
+	def throughput(self) -> float:
+		""" The number of bytes written per second."""
+		return self.size / self.seconds if self.seconds else float('inf')
+
+
+def _open_compressor(file1: BinaryIO, compression: Optional[str], member: str, stack: contextlib.ExitStack) -> BinaryIO:
+	""" Wraps a file so that anything written to it is compressed first. The compressor is closed by `stack`."""
+	if compression == 'gzip':
+		return stack.enter_context(gzip.GzipFile(fileobj = file1, mode = 'wb', compresslevel = 6))
+	if compression == 'bz2':
+		return stack.enter_context(bz2.BZ2File(file1, mode = 'wb'))
+	if compression == 'xz':
+		return stack.enter_context(lzma.LZMAFile(file1, mode = 'wb'))
+	if compression == 'zip':
+		archive = stack.enter_context(zipfile.ZipFile(file1, mode = 'w', compression = zipfile.ZIP_DEFLATED))
+		return stack.enter_context(archive.open(member, mode = 'w', force_zip64 = True))
+	return file1
+
+
+class _BackgroundWriter:
+	""" Writes to a stream from a separate thread, so that the caller can format the next chunk while the
+		previous one is being compressed. zlib, bz2 and lzma release the GIL while compressing.
+	"""
+
+	def __init__(self, stream: BinaryIO, size: int = 4):
+		self.stream = stream
+		self.queue = queue.Queue(maxsize = size)
+		self.exception: Optional[BaseException] = None
+		self.thread = threading.Thread(target = self._run, daemon = True)
+		self.thread.start()
+
+	def _run(self):
+		while True:
+			data = self.queue.get()
+			if data is None: break
+			if self.exception is not None: continue
+			try:
+				self.stream.write(data)
+			except BaseException as exception:
+				self.exception = exception
+
+	def write(self, data: bytes):
+		if self.exception is not None:
+			raise self.exception
+		self.queue.put(data)
+
+	def close(self):
+		self.queue.put(None)
+		self.thread.join()
+		if self.exception is not None:
+			raise self.exception
+
+
+def write_table(df: pandas.DataFrame, filename: Union[str, Path], index: bool = False, chunksize: int = 100000,
+		threaded: bool = True, buffer_size: int = 2 ** 22, **kwargs) -> WriteStatistics:
+	""" Saves a table using the format implied by its extension. This is the counterpart to `read_table`.
+		The file is written with `filetools.atomic_write`, so it is either written completely or not at all.
+		Parameters
+		----------
+			df: pandas.DataFrame
+			filename: str, Path
+				Supported extensions are .csv, .tsv, .pkl, .parquet and .feather. Text and pickle files may
+				also be compressed with .gz, .bz2, .xz or .zip (ex. 'table.tsv.gz').
+			index: bool; default False
+				Whether to include the index.
+			chunksize: int; default 100000
+				The number of rows formatted at a time when writing text files.
+			threaded: bool; default True
+				Whether to compress text files in a separate thread, so that compression and formatting overlap.
+			buffer_size: int; default 2**22
+				The size of the write buffer, in bytes.
+			**kwargs
+				Passed to `DataFrame.to_csv`, `to_parquet` or `to_feather`.
+		Returns
+		-------
+			WriteStatistics
+				The size of the output file and how long it took to write.
+	"""
+	filename = Path(filename)
+	suffixes = filename.suffixes
+	compression = COMPRESSION_EXTENSIONS.get(suffixes[-1]) if suffixes else None
+	extension = (suffixes[-2] if len(suffixes) > 1 else '') if compression else filename.suffix
+	if extension in BINARY_EXTENSIONS and compression:
+		message = f"{extension} files are already compressed internally, so they can't be saved as {filename.name}"
+		raise ValueError(message)
+	if extension not in DELIMITERS and extension not in BINARY_EXTENSIONS and extension != '.pkl':
+		raise NameError("{} does not have a valid extension!".format(filename))
+
+	start = time.perf_counter()
+	with filetools.atomic_write(filename, 'wb', buffering = buffer_size) as file1, contextlib.ExitStack() as stack:
+		if extension == '.parquet':
+			df.to_parquet(file1, index = index, **kwargs)
+		elif extension == '.feather':
+			df = df.reset_index() if index else df
+			df.to_feather(file1, **kwargs)
+		else:
+			writer = _open_compressor(file1, compression, filename.stem, stack)
+			if threaded and compression:
+				writer = _BackgroundWriter(writer)
+				# Registered last so that the thread finishes before the compressor is closed.
+				stack.callback(writer.close)
+			if extension == '.pkl':
+				pickle.dump(df, writer, protocol = pickle.HIGHEST_PROTOCOL)
+			else:
+				encoding = kwargs.get('encoding') or 'utf-8'
+				sep = kwargs.pop('sep', DELIMITERS[extension])
+				# Only the first chunk includes the header.
+				header = kwargs.pop('header', True)
+				for start_row in range(0, max(len(df), 1), chunksize):
+					chunk = df.iloc[start_row:start_row + chunksize]
+					text = chunk.to_csv(sep = sep, index = index, header = header if start_row == 0 else False, **kwargs)
+					writer.write(text.encode(encoding))
+	seconds = time.perf_counter() - start
+
+	statistics = WriteStatistics(filename, len(df), filename.stat().st_size, seconds)
+	logger.debug(f"Wrote {filename} at {numbertools.human_readable(statistics.throughput)}B/s")
+	return statistics
@@ -1,3 +1,4 @@
+from ._codec import pack_durations, pack_timestamps, unpack_durations, unpack_timestamps
 from ._duration import Duration
 from ._timer import Timer
 from ._timestamp import Timestamp
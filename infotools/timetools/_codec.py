@@ -0,0 +1,91 @@
+"""
+	Packs sequences of timestamps and durations into buffers of int64 values, so that large numbers of them can be
+	sent to other processes (ex. through `multiprocessing.shared_memory`) without pickling each object.
+	Ex.
+		data = pack_timestamps(timestamps)
+		shared = shared_memory.SharedMemory(create = True, size = len(data))
+		shared.buf[:len(data)] = data
+		# In the other process:
+		timestamps = unpack_timestamps(shared_memory.SharedMemory(name).buf)
+	Missing values (`None`) are supported. Buffers use the native byte order, so they should only be shared on the
+	same machine.
+"""
+import array
+import struct
+from typing import Iterable, List, Optional
+
+from ._duration import Duration
+from ._timestamp import Timestamp, _get_timezone_name
+
+# Stored in place of `None`.
+MISSING = -2 ** 63
+_HEADER = struct.Struct('=qq')
+
+
+def _get_view(buffer, start: int, count: int) -> memoryview:
+	""" Returns `count` int64 values from `buffer` without copying it. `start` is in bytes."""
+	return memoryview(buffer).cast('B')[start:start + 8 * count].cast('q')
+
+
+def pack_timestamps(values: Iterable[Optional[Timestamp]]) -> bytes:
+	""" Converts timestamps into a buffer of int64 values.
+		Layout: the number of timestamps and the length of the timezone names, the microseconds since 1970-01-01 UTC of
+		each timestamp, the index of each timestamp's timezone (-1 if it doesn't have one), then the timezone names
+		separated by newlines, padded to a multiple of 8 bytes.
+	"""
+	microseconds = array.array('q')
+	codes = array.array('q')
+	timezones = dict()
+	for value in values:
+		if value is None:
+			microseconds.append(MISSING)
+			codes.append(-1)
+			continue
+		if not isinstance(value, Timestamp):
+			value = Timestamp(value)
+		microseconds.append(value.to_epoch())
+		name = _get_timezone_name(value.tzinfo)
+		codes.append(-1 if name is None else timezones.setdefault(name, len(timezones)))
+
+	names = "\n".join(timezones).encode('utf-8')
+	padding = b'\0' * (-len(names) % 8)
+	return _HEADER.pack(len(microseconds), len(names)) + microseconds.tobytes() + codes.tobytes() + names + padding
+
+
+def unpack_timestamps(buffer) -> List[Optional[Timestamp]]:
+	""" The inverse of `pack_timestamps`. `buffer` can be any bytes-like object, including a memoryview of shared memory."""
+	count, length = _HEADER.unpack_from(buffer, 0)
+	microseconds = _get_view(buffer, _HEADER.size, count)
+	codes = _get_view(buffer, _HEADER.size + 8 * count, count)
+	start = _HEADER.size + 16 * count
+	timezones = bytes(memoryview(buffer)[start:start + length]).decode('utf-8').split("\n") if length else []
+
+	result = list()
+	for value, code in zip(microseconds, codes):
+		if value == MISSING:
+			result.append(None)
+		else:
+			result.append(Timestamp.from_epoch(value, timezones[code] if code >= 0 else None))
+	return result
+
+
+def pack_durations(values: Iterable[Optional[Duration]]) -> bytes:
+	""" Converts durations into a buffer of int64 values: the number of durations, followed by the length of each one in microseconds."""
+	microseconds = array.array('q')
+	for value in values:
+		if value is None:
+			microseconds.append(MISSING)
+		else:
+			if not isinstance(value, Duration):
+				value = Duration(value)
+			microseconds.append(value.to_microseconds())
+	return _HEADER.pack(len(microseconds), 0) + microseconds.tobytes()
+
+
+def unpack_durations(buffer) -> List[Optional[Duration]]:
+	""" The inverse of `pack_durations`."""
+	count, _ = _HEADER.unpack_from(buffer, 0)
+	return [
+		None if value == MISSING else Duration.from_microseconds(value)
+		for value in _get_view(buffer, _HEADER.size, count)
+	]
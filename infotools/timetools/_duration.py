@@ -190,6 +190,29 @@ class Duration(pendulum.Duration):
 		timedelta_keys = dict(zip(keys, value))
 		return cls.from_dict(**timedelta_keys)
 
+	def __reduce__(self):
+		# pendulum pickles the arguments to `pendulum.Duration`, which `Duration.__new__` doesn't accept.
+		return _restore_duration, (self.to_microseconds(),)
+
+	def __reduce_ex__(self, protocol):
+		return self.__reduce__()
+
+	@classmethod
+	def from_microseconds(cls, microseconds: int) -> 'Duration':
+		""" The inverse of `to_microseconds`."""
+		days, microseconds = divmod(microseconds, 86400 * 10 ** 6)
+		seconds, microseconds = divmod(microseconds, 10 ** 6)
+		return cls.from_dict(days = days, seconds = seconds, microseconds = microseconds)
+
+	def to_microseconds(self) -> int:
+		""" Returns the length of the duration as an integer, which, unlike `total_seconds`, is exact."""
+		# pendulum replaces `seconds` and `microseconds` with signed values that don't add up to the total for negative
+		# durations, so use the normalized values from `datetime.timedelta` instead.
+		days = datetime.timedelta.days.__get__(self)
+		seconds = datetime.timedelta.seconds.__get__(self)
+		microseconds = datetime.timedelta.microseconds.__get__(self)
+		return (days * 86400 + seconds) * 10 ** 6 + microseconds
+
 	def to_dict(self) -> Dict[str, int]:
 		""" Returns a dictionary that can be used to instantiate another timedelta or Duration object. """
 		result = {
@@ -314,3 +337,7 @@ class Duration(pendulum.Duration):
 	def to_yaml(self) -> str:
 		""" Returns a yaml representation of `self`"""
 		return self.to_json()
+
+
+def _restore_duration(microseconds: int) -> Duration:
+	return Duration.from_microseconds(microseconds)
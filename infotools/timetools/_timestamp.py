@@ -6,15 +6,19 @@
 """
 
 import datetime
+import functools
 import re
 from typing import *
 
 import pendulum
-from loguru import logger
+
+from .._logging import count_parse, debug
 
 STuple = Tuple[int, ...]
 TTuple = Tuple[int, int, int]
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+
 
 def _attempt_to_get_attribute(obj: Any, key: str, default = 0):
 	try:
@@ -24,6 +28,29 @@ def _attempt_to_get_attribute(obj: Any, key: str, default = 0):
 	return attribute
 
 
+def _get_timezone_name(tzinfo: Optional[datetime.tzinfo]) -> Optional[str]:
+	""" Returns a name that `_get_timezone` can convert back to the timezone. Timezones without an IANA name
+		(ex. 'America/New_York') are named by their UTC offset (ex. '+02:00').
+	"""
+	if tzinfo is None:
+		return None
+	name = getattr(tzinfo, 'name', None) or getattr(tzinfo, 'key', None)
+	if isinstance(name, str):
+		return name
+	offset = tzinfo.utcoffset(None)
+	return pendulum.fixed_timezone(int(offset.total_seconds())).name
+
+
+@functools.lru_cache(maxsize = None)
+def _get_timezone(name: str) -> datetime.tzinfo:
+	""" The inverse of `_get_timezone_name`."""
+	if name[0] in '+-':
+		sign = -1 if name[0] == '-' else 1
+		hours, minutes, *seconds = map(int, name[1:].split(':'))
+		return pendulum.fixed_timezone(sign * (hours * 3600 + minutes * 60 + sum(seconds)))
+	return pendulum.timezone(name)
+
+
 class Timestamp(pendulum.DateTime):
 	def __new__(cls, *args, **kwargs):
 		if len(args) == 1:
@@ -44,6 +71,14 @@ class Timestamp(pendulum.DateTime):
 		result = f"Timestamp('{iso_string}')"
 		return result
 
+	def __reduce__(self):
+		# pendulum pickles the timezone object along with every timestamp. An integer and the timezone's name are
+		# much cheaper to send between processes.
+		return _restore_timestamp, (self.to_epoch(), _get_timezone_name(self.tzinfo))
+
+	def __reduce_ex__(self, protocol):
+		return self.__reduce__()
+
 	def __eq__(self, other):
 		return self.year == other.year and self.month == other.month and self.day == other.day and self.hour == other.hour and self.minute == other.minute and self.second == other.second
 
@@ -76,7 +111,7 @@ class Timestamp(pendulum.DateTime):
 
 	@classmethod
 	def from_tuple(cls, value: Union[STuple, TTuple]) -> 'Timestamp':
-		logger.debug(f"from_tuple({value})")
+		debug("from_tuple({})", value)
 		if len(value) == 3:
 			year, month, day = value
 			hour, minute, second = 0, 0, 0
@@ -138,7 +173,7 @@ class Timestamp(pendulum.DateTime):
 		-------
 		pendulum.DateTime
 		"""
-		logger.debug(f"from_american_date({value})")
+		debug("from_american_date({})", value)
 		if ' ' in value:
 			dates, times = value.split(' ')
 		elif 'T' in value:
@@ -172,7 +207,7 @@ class Timestamp(pendulum.DateTime):
 
 	@classmethod
 	def from_verbal_date(cls, value: str) -> Optional["Timestamp"]:
-		logger.debug(f"from_verbal_date({value})")
+		debug("from_verbal_date({})", value)
 		# 17 Dec 2012
 		verbal_regex_month_first = "(?P<month>[a-z]+)\s(?P<day>[\d]+)[\s,]+(?P<year>[\d]{4})"
 		verbal_regex_day_first = "(?P<day>[\d]+)[\s,]+(?P<month>[a-z]+)\s(?P<year>[\d]{4})"
@@ -206,12 +241,17 @@ class Timestamp(pendulum.DateTime):
 	def from_string(cls, value: str) -> 'Timestamp':
 		try:
 			obj = pendulum.parse(value)
+			strategy = 'pendulum'
 		except ValueError:
 			try:
 				obj = cls.from_american_date(value)
+				strategy = 'american'
 			except ValueError:
 				obj = cls.from_verbal_date(value)
-		return cls.from_object(obj)
+				strategy = 'verbal'
+		result = cls.from_object(obj)
+		count_parse(strategy)
+		return result
 
 	@classmethod
 	def from_values(cls, year, month, day, hour = 0, minute = 0, second = 0, microsecond = 0,
@@ -227,6 +267,32 @@ class Timestamp(pendulum.DateTime):
 		)
 		return cls.from_dict(**result)
 
+	@classmethod
+	def from_epoch(cls, microseconds: int, timezone: Optional[str] = None) -> 'Timestamp':
+		""" The inverse of `to_epoch`.
+			Parameters
+			----------
+			microseconds: int
+				The number of microseconds since 1970-01-01 UTC.
+			timezone: str; default None
+				The timezone to convert the timestamp to, as either an IANA name (ex. 'America/New_York') or a UTC
+				offset (ex. '+02:00').
+				If `None`, the timestamp won't have a timezone.
+		"""
+		value = _EPOCH + datetime.timedelta(microseconds = microseconds)
+		if timezone is not None:
+			value = value.replace(tzinfo = datetime.timezone.utc).astimezone(_get_timezone(timezone))
+		# Skip `Timestamp.__new__`, which would parse the values and drop the timezone.
+		return datetime.datetime.__new__(
+			cls, value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond,
+			value.tzinfo, fold = value.fold
+		)
+
+	def to_epoch(self) -> int:
+		""" Returns the number of microseconds since 1970-01-01 UTC. Timestamps without a timezone are treated as UTC."""
+		delta = self.to_datetime() - (self.utcoffset() or datetime.timedelta(0)) - _EPOCH
+		return (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+
 	def to_iso(self) -> str:
 		return self.to_iso8601_string()
 
@@ -236,5 +302,9 @@ class Timestamp(pendulum.DateTime):
 			hour = self.hour, minute = self.minute, second = self.second, microsecond = self.microsecond
 		)
 
+def _restore_timestamp(microseconds: int, timezone: Optional[str]) -> Timestamp:
+	return Timestamp.from_epoch(microseconds, timezone)
+
+
 if __name__ == "__main__":
 	pass
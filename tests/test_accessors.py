@@ -0,0 +1,76 @@
+"""
+	Suite of tests for the pandas accessors
+"""
+import math
+
+import pandas
+import pytest
+
+from infotools import accessors, numbertools  # Importing `accessors` registers them.
+from infotools.timetools import Duration, Timestamp
+
+
+def test_to_number():
+	series = pandas.Series(['1,234', '0.5', '3/4', 'abc', None])
+	result = series.infotools.to_number()
+	assert result.tolist()[:3] == [1234, 0.5, 0.75]
+	assert math.isnan(result[3]) and math.isnan(result[4])
+
+	result = series.infotools.to_number(default = -1)
+	assert result[3] == -1
+	assert pandas.isna(result[4])
+
+	# Mixed object columns fall back to the scalar function.
+	series = pandas.Series(['12', 3.0, None], dtype = object)
+	assert series.infotools.to_number().tolist() == [12, 3, None]
+
+
+def test_to_number_scalar_missing():
+	assert math.isnan(numbertools.to_number(None))
+	assert math.isinf(numbertools.to_number('inf'))
+
+
+@pytest.mark.parametrize("values", [[0, 1, 999, 1234, -15000, 2.5E9, 7E12], ['1,234', '12', '0.001']])
+def test_human_readable(values):
+	series = pandas.Series(values)
+	expected = [numbertools.human_readable(numbertools.to_number(value)) for value in values]
+	assert series.infotools.human_readable().tolist() == expected
+
+	result = pandas.Series([1E6, None]).infotools.human_readable(precision = 1)
+	assert result.tolist() == ['1.0M', None]
+
+
+def test_to_timestamp():
+	values = ['2019-05-06T01:02:03.5', '2019-05-06 01:02:03+05:00', 'May 6, 2019', '05/06/2019']
+	result = pandas.Series(values + [None]).infotools.to_timestamp()
+	assert result.tolist() == [Timestamp.parse(value) for value in values] + [None]
+	assert all(isinstance(value, Timestamp) for value in result[:-1])
+
+	series = pandas.Series(pandas.to_datetime(['2019-05-06 01:02:03', None]))
+	result = series.infotools.to_timestamp()
+	assert result[0] == Timestamp(2019, 5, 6, 1, 2, 3)
+	assert result[1] is None
+
+
+def test_to_duration():
+	values = ['PT1H', 'P1DT2H3M4.5S', '1:02:03', 'P1Y2M']
+	result = pandas.Series(values + [None]).infotools.to_duration()
+	assert result.tolist() == [Duration.parse(value) for value in values] + [None]
+	assert all(isinstance(value, Duration) for value in result[:-1])
+
+	result = pandas.Series([90, 1.5]).infotools.to_duration()
+	assert result.tolist() == [Duration(minutes = 1, seconds = 30), Duration(seconds = 1, microseconds = 500000)]
+	result = pandas.Series([2]).infotools.to_duration(unit = 'h')
+	assert result[0] == Duration(hours = 2)
+
+
+def test_dataframe_accessor():
+	df = pandas.DataFrame({'size': ['1,000', '2000'], 'elapsed': ['PT1S', 'PT2S'], 'name': ['a', 'b']})
+	result = df.infotools.to_number(columns = ['size'])
+	assert result['size'].tolist() == [1000, 2000]
+	assert df['size'].tolist() == ['1,000', '2000']
+
+	result = result.infotools.human_readable(columns = ['size'])
+	assert result['size'].tolist() == ['1.00K', '2.00K']
+	result = df.infotools.to_duration(columns = ['elapsed'])
+	assert result['elapsed'].tolist() == [Duration(seconds = 1), Duration(seconds = 2)]
@@ -0,0 +1,19 @@
+from benchmarks import compare_results, load_results, run_benchmarks, save_results
+
+
+def test_run_benchmarks(tmp_path):
+	results = run_benchmarks(['human_readable', 'to_squareform'], sizes = ['small'], repeat = 2)
+	assert set(results['results']) == {'human_readable[small]', 'to_squareform[small]'}
+	assert results['results']['human_readable[small]']['min'] > 0
+
+	filename = save_results(results, tmp_path / "results.json")
+	assert load_results(filename) == results
+
+
+def test_compare_results():
+	baseline = {'results': {'fast[small]': {'min': 1.0}, 'slow[small]': {'min': 1.0}, 'removed[small]': {'min': 1.0}}}
+	current = {'results': {'fast[small]': {'min': 1.05}, 'slow[small]': {'min': 1.5}}}
+	comparisons = compare_results(baseline, current, threshold = 0.1)
+	assert [comparison.name for comparison in comparisons] == ['fast[small]', 'slow[small]']
+	assert [comparison.regressed for comparison in comparisons] == [False, True]
+	assert comparisons[1].change == 0.5
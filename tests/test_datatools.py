@@ -1,6 +1,9 @@
+import itertools
 import math
 
+import numpy
 import pandas
+import pytest
 
 from infotools import datatools
 
@@ -21,3 +24,173 @@ def test_to_squareform():
 	result = datatools.to_squareform(data)
 
 	pandas.testing.assert_frame_equal(result, expected)
+
+
+def test_to_squareform_numeric():
+	data = {
+		('a', 'b'): 1,
+		('b', 'c'): 2,
+		('a', 'c'): 3,
+		('c', 'a'): 4
+	}
+	result = datatools.to_squareform(data)
+	assert result.dtypes.eq('float64').all()
+	assert math.isnan(result.loc['a', 'a'])
+	assert result.loc['b', 'a'] == result.loc['a', 'b'] == 1
+	# Pairs given in both orders keep both values.
+	assert result.loc['c', 'a'] == 3
+	assert result.loc['a', 'c'] == 4
+
+	result = datatools.to_squareform(data, default = 0)
+	assert result.dtypes.eq('int64').all()
+	assert result.loc['a', 'a'] == 0
+	assert result.values.sum() == 2 * (1 + 2) + 3 + 4
+
+	# A fractional default isn't truncated to fit the integer values.
+	result = datatools.to_squareform({('a', 'b'): 1, ('b', 'c'): 2}, default = 0.5)
+	assert result.dtypes.eq('float64').all()
+	assert result.loc['a', 'a'] == result.loc['a', 'c'] == 0.5
+	assert result.loc['b', 'a'] == 1
+
+	# Complete integer input stays integral without a default.
+	complete = {('a', 'a'): 0, ('a', 'b'): 1, ('b', 'b'): 0}
+	result = datatools.to_squareform(complete)
+	assert result.dtypes.eq('int64').all()
+	assert result.loc['b', 'a'] == 1
+
+
+def test_to_squareform_booleans():
+	result = datatools.to_squareform({('a', 'b'): True, ('b', 'c'): False})
+	assert result.loc['b', 'a'] is True
+	assert result.loc['c', 'b'] is False
+	assert result.loc['a', 'a'] is None
+
+
+def test_stream_squareform(tmp_path):
+	triples = [('b', 'a', 1.0), ('c', 'a', 2.0), ('c', 'b', 3.0)]
+	expected = datatools.to_squareform({(left, right): value for left, right, value in triples})
+
+	result = datatools.stream_squareform(iter(triples), chunksize = 2)
+	assert list(result.labels) == ['a', 'b', 'c']
+	pandas.testing.assert_frame_equal(result.to_frame(), expected)
+	pandas.testing.assert_frame_equal(result.select(['c'], ['a', 'b']), expected.loc[['c'], ['a', 'b']])
+
+	filename = tmp_path / "matrix.npy"
+	result = datatools.stream_squareform(iter(triples), filename, labels = ['c', 'b', 'a'], default = 0)
+	saved = numpy.load(filename, mmap_mode = 'r')
+	assert saved[0, 2] == saved[2, 0] == 2.0
+	assert saved[1, 1] == 0
+	with pytest.raises(KeyError):
+		datatools.stream_squareform([('a', 'd', 1.0)], labels = ['a', 'b'])
+
+
+def test_to_condensed():
+	scipy_distance = pytest.importorskip('scipy.spatial.distance')
+	data = {('a', 'b'): 1.0, ('c', 'b'): 2.0, ('a', 'c'): 3.0, ('d', 'a'): 4.0}
+	result = datatools.to_condensed(data)
+	assert list(result.labels) == ['a', 'b', 'c', 'd']
+	assert result.get('b', 'c') == result.get('c', 'b') == 2.0
+	assert math.isnan(result.get('b', 'd'))
+
+	expected = datatools.to_squareform(data)
+	pandas.testing.assert_frame_equal(result.to_frame(), expected)
+	# The vector is in the same order as scipy.
+	square = expected.fillna(0).values
+	numpy.testing.assert_array_equal(numpy.nan_to_num(result.values), scipy_distance.squareform(square))
+	numpy.testing.assert_array_equal(datatools.SquareMatrix(expected.index, expected.values).to_condensed().values, result.values)
+
+
+def test_to_sparse():
+	pytest.importorskip('scipy')
+	triples = [('a', 'b', 1.0), ('b', 'c', 2.0), ('a', 'b', 5.0), ('c', 'c', 0.0)]
+	result = datatools.to_sparse(triples)
+	assert result.values.nnz == 5
+	frame = result.to_frame()
+	assert frame.loc['a', 'b'] == frame.loc['b', 'a'] == 5.0
+	assert frame.loc['c', 'c'] == 0.0
+	assert math.isnan(frame.loc['a', 'c'])
+
+	dense = datatools.stream_squareform(triples).to_sparse(format = 'coo')
+	pandas.testing.assert_frame_equal(dense.to_frame(), frame)
+
+	result = datatools.to_sparse(triples, symmetric = False)
+	assert result.values.nnz == 3
+	assert result.to_frame().loc['b', 'a'] == 5.0
+
+
+def _difference(left, right):
+	return right - left
+
+
+def _differences(lefts, rights):
+	return numpy.subtract.outer(rights, lefts).T
+
+
+def test_pairwise():
+	items = [1, 3, 7, 15, 31]
+	expected = datatools.to_squareform({(left, right): abs(left - right) for left in items for right in items if left != right})
+	result = datatools.pairwise(items, _difference, workers = 1, tile_size = 2)
+	pandas.testing.assert_frame_equal(result.to_frame(), expected)
+
+	# Asymmetric values are stored in the same cells as `to_squareform`.
+	expected = datatools.to_squareform({(left, right): right - left for left in items for right in items if left != right})
+	result = datatools.pairwise(items, _difference, workers = 2, symmetric = False, tile_size = 2)
+	pandas.testing.assert_frame_equal(result.to_frame(), expected)
+	result = datatools.pairwise(numpy.array(items), _differences, workers = 2, symmetric = False, vectorized = True, labels = items, tile_size = 2)
+	pandas.testing.assert_frame_equal(result.to_frame(), expected)
+
+	result = datatools.pairwise(items, _difference, workers = 1, output = 'condensed', diagonal = True, tile_size = 3)
+	assert result.get(3, 15) == 12
+	numpy.testing.assert_array_equal(result.values, [abs(left - right) for left, right in itertools.combinations(items, 2)])
+	with pytest.raises(ValueError):
+		datatools.pairwise(items, _difference, symmetric = False, output = 'condensed')
+
+
+def _distances(lefts, rights):
+	return numpy.sqrt(((lefts[:, None, :] - rights[None, :, :]) ** 2).sum(axis = 2))
+
+
+def test_pairwise_points():
+	points = numpy.array([[0.0, 0.0], [3.0, 4.0], [6.0, 8.0]])
+	result = datatools.pairwise(points, _distances, workers = 1, vectorized = True, output = 'condensed', tile_size = 2)
+	assert list(result.labels) == [0, 1, 2]
+	numpy.testing.assert_allclose(result.values, [5.0, 10.0, 5.0])
+
+
+def test_from_squareform():
+	data = {('a', 'b'): 'ab', ('b', 'c'): 'bc', ('a', 'c'): 'ac'}
+	result = datatools.from_squareform(datatools.to_squareform(data))
+	assert list(result.itertuples(index = False, name = None)) == [('a', 'b', 'ab'), ('a', 'c', 'ac'), ('b', 'c', 'bc')]
+
+	data = {('a', 'b'): 3.0, ('a', 'c'): 1.0, ('b', 'c'): 2.0, ('a', 'd'): 5.0}
+	matrix = datatools.to_squareform(data)
+	result = datatools.from_squareform(matrix, dropna = False, block_size = 3, as_frame = False)
+	assert len(result['value']) == 6
+	assert numpy.isnan(result['value']).sum() == 2
+	condensed = datatools.from_squareform(datatools.to_condensed(data), dropna = False)
+	pandas.testing.assert_frame_equal(condensed, pandas.DataFrame(result))
+
+	result = datatools.from_squareform(matrix, top_k = 2, block_size = 3)
+	assert list(result.itertuples(index = False, name = None)) == [
+		('c', 'a', 1.0), ('b', 'a', 3.0), ('c', 'b', 2.0), ('a', 'b', 3.0), ('a', 'c', 1.0), ('b', 'c', 2.0), ('a', 'd', 5.0)
+	]
+	result = datatools.from_squareform(matrix, top_k = 1, largest = True)
+	assert list(result['left']) == ['d', 'a', 'b', 'a']
+
+
+def test_from_squareform_asymmetric():
+	data = {('a', 'b'): 1.0, ('b', 'a'): 2.0, ('a', 'c'): 3.0, ('c', 'b'): 4.0}
+	result = datatools.from_squareform(datatools.stream_squareform(data, symmetric = False), symmetric = False, block_size = 2)
+	assert {(left, right): value for left, right, value in result.itertuples(index = False, name = None)} == data
+
+	# `to_squareform` also fills in the reverse of pairs given in only one order.
+	matrix = datatools.to_squareform(data)
+	result = datatools.from_squareform(matrix, symmetric = False, block_size = 2)
+	assert {(left, right): value for left, right, value in result.itertuples(index = False, name = None)} == {
+		**data, ('c', 'a'): 3.0, ('b', 'c'): 4.0
+	}
+	# Each record is in the same orientation as the input to `to_squareform`.
+	result = datatools.from_squareform(datatools.to_squareform({('a', 'b'): 1.0, ('c', 'b'): 4.0}))
+	assert list(result.itertuples(index = False, name = None)) == [('a', 'b', 1.0), ('b', 'c', 4.0)]
+	result = datatools.from_squareform(matrix, diagonal = True, dropna = False, symmetric = False)
+	assert len(result) == 9
@@ -1,10 +1,11 @@
 import datetime
+import pickle
 from dataclasses import dataclass
 
 import pendulum
 import pytest
 
-from infotools.timetools import Duration
+from infotools.timetools import Duration, pack_durations, unpack_durations
 
 
 @pytest.fixture
@@ -173,3 +174,24 @@ def test_to_iso_full(seconds, expected):
 def test_to_iso_medium(seconds, expected):
 	result = Duration(seconds = seconds).to_iso(compact = False, include_microseconds = True)
 	assert result == expected
+
+
+@pytest.mark.parametrize(
+	"value",
+	[
+		Duration(days = 3, hours = 4, seconds = 5, microseconds = 6),
+		Duration(days = -3, seconds = 5, microseconds = 7),
+		Duration(microseconds = 10 ** 15 + 1)
+	]
+)
+def test_duration_pickle(value):
+	result = pickle.loads(pickle.dumps(value))
+	assert isinstance(result, Duration)
+	assert result == value
+	assert result.to_microseconds() == value.to_microseconds()
+
+
+def test_pack_durations():
+	values = [Duration(days = 3, seconds = 5), None, Duration(microseconds = -123456789)]
+	result = unpack_durations(pack_durations(values))
+	assert result == values
@@ -1,3 +1,5 @@
+import os
+import zipfile
 from pathlib import Path
 
 import pytest
@@ -16,12 +18,182 @@ from infotools import filetools
 def test_get_mimetype(filename, expected):
 	assert filetools.get_mimetype(filename) == expected
 
+@pytest.mark.parametrize(
+	"contents, expected",
+	[
+		(b"\x1f\x8b\x08\x00" + bytes(20), ('application', 'gzip')),
+		(b"\x89PNG\r\n\x1a\n" + bytes(20), ('image', 'png')),
+		(b"%PDF-1.4\n", ('application', 'pdf')),
+		(b"PAR1" + bytes(20), ('application', 'vnd.apache.parquet')),
+		(b"PK\x03\x04" + bytes(26) + b"data.csv", ('application', 'zip')),
+		(bytes(257) + b"ustar\x0000", ('application', 'x-tar')),
+		(b"a,b,c\n1,2,3\n", ('text', 'plain')),
+		(b"\x00\x01\x02\x03", None)
+	]
+)
+def test_sniff_mimetype(tmp_path, contents, expected):
+	filename = tmp_path / "extensionless"
+	filename.write_bytes(contents)
+	assert filetools.sniff_mimetype(filename) == expected
+
+
+def test_sniff_mimetype_office(tmp_path):
+	pandas = pytest.importorskip('pandas')
+	pytest.importorskip('openpyxl')
+	filename = tmp_path / "extensionless"
+	# The first member of these archives is `[Content_Types].xml` rather than anything under `xl/`.
+	pandas.DataFrame({'a': [1, 2]}).to_excel(filename, engine = 'openpyxl')
+	assert filetools.sniff_mimetype(filename) == ('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+	with zipfile.ZipFile(filename, 'w') as archive:
+		archive.writestr("data.csv", "a,b\n1,2\n")
+	assert filetools.sniff_mimetype(filename) == ('application', 'zip')
+
+
+def test_get_mimetypes(tmp_path):
+	gzipped = tmp_path / "table.csv"
+	gzipped.write_bytes(b"\x1f\x8b\x08\x00" + bytes(20))
+	text = tmp_path / "table.tsv"
+	text.write_text("a\tb\n")
+
+	expected = [('application', 'gzip'), ('text', 'tab-separated-values'), ('video', 'mp4')]
+	result = filetools.get_mimetypes([gzipped, text, tmp_path / "missing.mp4"])
+	assert result == expected
+
+	assert filetools.get_mimetypes([gzipped], sniff = False) == [('text', 'csv')]
+
+
 def test_checkdir(tmp_path):
-	folder = Path(__file__).parent / "new"
+	folder = tmp_path / "new" / "nested"
 	result = filetools.checkdir(folder)
 
 	logger.debug(f"Folder: {folder}, {type(folder)}, {folder.exists()}")
 	logger.debug(f"result: {result}, {type(result)}, {result.exists()}")
 	logger.debug(f"{result == folder}")
 	assert result == folder
-	assert result.exists()
\ No newline at end of file
+	assert result.exists()
+
+def test_find_duplicates(tmp_path):
+	large = bytes(range(256)) * 1024
+	contents = {
+		"a.txt": b"abc",
+		"b.txt": b"abc",
+		"c.txt": b"abd",
+		"nested/d.bin": large,
+		"nested/e.bin": large,
+		# Same size, start and end as the other large files, but a different middle.
+		"nested/f.bin": large[:100000] + b"x" + large[100001:]
+	}
+	for name, data in contents.items():
+		filename = tmp_path / name
+		filename.parent.mkdir(exist_ok = True)
+		filename.write_bytes(data)
+
+	result = filetools.find_duplicates([tmp_path], blocksize = 1024)
+	result = sorted(sorted(i.name for i in group) for group in result)
+	assert result == [['a.txt', 'b.txt'], ['d.bin', 'e.bin']]
+
+
+def test_fingerprint_directory(tmp_path):
+	folder = tmp_path / "dataset"
+	(folder / "nested").mkdir(parents = True)
+	(folder / "a.txt").write_text("a")
+	(folder / "nested" / "b.txt").write_text("b")
+	(folder / "nested" / "c.txt").write_text("c")
+	state = tmp_path / "fingerprint.json"
+
+	first = filetools.fingerprint_directory(folder, state)
+	assert first.added == ['a.txt', 'nested/b.txt', 'nested/c.txt']
+	assert filetools.fingerprint_directory(folder, state) == filetools.DirectoryFingerprint(first.root)
+
+	(folder / "nested" / "b.txt").write_text("modified")
+	(folder / "nested" / "c.txt").unlink()
+	(folder / "d.txt").write_text("d")
+	result = filetools.fingerprint_directory(folder, state)
+	assert result.changed
+	assert (result.added, result.removed, result.modified) == (['d.txt'], ['nested/c.txt'], ['nested/b.txt'])
+	assert result.root != first.root
+
+	# The incremental hash should match a hash computed from scratch.
+	assert filetools.fingerprint_directory(folder).root == result.root
+
+
+def test_fingerprint_directory_relative_state(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	(tmp_path / "dataset").mkdir()
+	(tmp_path / "dataset" / "a.txt").write_text("a")
+	state = tmp_path / "dataset" / "state.json"
+
+	first = filetools.fingerprint_directory("dataset", state)
+	assert first.added == ['a.txt']
+	second = filetools.fingerprint_directory("dataset", "dataset/state.json")
+	assert not second.changed
+	assert second.root == first.root
+
+
+def test_disk_usage(tmp_path):
+	(tmp_path / "a" / "b").mkdir(parents = True)
+	(tmp_path / "c").mkdir()
+	(tmp_path / "a" / "file1.bin").write_bytes(bytes(1000))
+	(tmp_path / "a" / "b" / "file2.bin").write_bytes(bytes(3000))
+	(tmp_path / "c" / "file3.bin").write_bytes(bytes(500))
+	# Hardlinks should only be counted once.
+	os.link(tmp_path / "c" / "file3.bin", tmp_path / "c" / "file4.bin")
+	folder_sizes = {name: os.lstat(tmp_path / name).st_size for name in ['', 'a', 'a/b', 'c']}
+
+	result = filetools.disk_usage(tmp_path, depth = 1)
+	assert [i.path.name for i in result.children] == ['a', 'c']
+	assert result.children[0].children == []
+	assert result.files == 3
+	assert result.children[1].apparent == 500 + folder_sizes['c']
+	assert result.apparent == 4500 + sum(folder_sizes.values())
+	assert result.to_tree(allocated = False).splitlines()[1].endswith("\ta")
+
+	streamed = list(filetools.iter_disk_usage(tmp_path))
+	assert streamed[-1] == filetools.disk_usage(tmp_path)
+	assert {i.path.name for i in streamed[:-1]} == {'a', 'b', 'c'}
+
+
+def test_disk_usage_missing_folder(tmp_path):
+	result = filetools.disk_usage(tmp_path / "missing")
+	assert (result.apparent, result.allocated, result.files, result.children) == (0, 0, 0, [])
+
+
+def test_atomic_write(tmp_path):
+	filename = tmp_path / "nested" / "output.txt"
+	with filetools.atomic_write(filename, 'w') as file1:
+		file1.write("first")
+	assert filename.read_text() == "first"
+
+	with pytest.raises(RuntimeError):
+		with filetools.atomic_write(filename, 'w') as file1:
+			file1.write("second")
+			raise RuntimeError
+	# The original file should be untouched and the temporary file removed.
+	assert filename.read_text() == "first"
+	assert list(filename.parent.iterdir()) == [filename]
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason = "The umask can only be read on Linux.")
+def test_atomic_write_permissions(tmp_path):
+	expected = tmp_path / "expected.txt"
+	expected.write_text("")
+	filename = tmp_path / "output.txt"
+	with filetools.atomic_write(filename, 'w') as file1:
+		file1.write("first")
+	assert filename.stat().st_mode == expected.stat().st_mode
+
+	os.chmod(filename, 0o640)
+	with filetools.atomic_write(filename, 'w') as file1:
+		file1.write("second")
+	assert filename.stat().st_mode & 0o777 == 0o640
+
+
+def test_atomic_write_batch(tmp_path):
+	with filetools.AtomicWriteBatch() as batch:
+		for index in range(3):
+			with batch.open(tmp_path / f"{index}.bin") as file1:
+				file1.write(bytes([index]))
+		assert batch.folders == {tmp_path}
+	assert batch.folders == set()
+	assert sorted(i.read_bytes() for i in tmp_path.iterdir()) == [b"\x00", b"\x01", b"\x02"]
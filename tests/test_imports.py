@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+# The maximum cumulative import time of each subpackage, in seconds, including the `infotools` package itself.
+# These are about three times the usual import times (25, 100, 45, 110 and 700 ms), so that slow machines don't
+# fail the test while an eager import of a large dependency still does.
+BUDGETS = {
+	'infotools':             0.1,
+	'infotools.filetools':   0.3,
+	'infotools.numbertools': 0.15,
+	'infotools.timetools':   0.4,
+	'infotools.datatools':   2.0,
+	'infotools.tabletools':  2.0
+}
+# Large dependencies that each subpackage shouldn't import until they're actually used.
+DEFERRED = {
+	'infotools':             ['fuzzywuzzy', 'loguru', 'numpy', 'pandas', 'pendulum'],
+	'infotools.filetools':   ['fuzzywuzzy', 'loguru', 'numpy', 'pandas', 'pendulum'],
+	'infotools.numbertools': ['fuzzywuzzy', 'loguru', 'numpy', 'pandas', 'pendulum'],
+	'infotools.timetools':   ['fuzzywuzzy', 'loguru', 'numpy', 'pandas'],
+	'infotools.datatools':   ['fuzzywuzzy', 'loguru', 'pendulum', 'scipy'],
+	'infotools.tabletools':  ['fuzzywuzzy', 'loguru', 'pendulum']
+}
+
+
+def measure_imports(module: str) -> Dict[str, float]:
+	""" Imports a module in a new interpreter and returns the cumulative import time of every module it loaded, in seconds."""
+	process = subprocess.run(
+		[sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+		cwd = str(ROOT), capture_output = True, text = True, check = True
+	)
+	times = dict()
+	for line in process.stderr.splitlines():
+		if not line.startswith('import time:') or 'self [us]' in line: continue
+		_, cumulative, name = line[len('import time:'):].split('|')
+		times[name.strip()] = int(cumulative) / 1E6
+	return times
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_import_budget(module):
+	# A single slow run on a busy machine isn't a regression, so the fastest of a few attempts is used.
+	for _ in range(3):
+		times = measure_imports(module)
+		if times[module] < BUDGETS[module]: break
+	assert times[module] < BUDGETS[module]
+	loaded = [name for name in DEFERRED[module] if name in times]
+	assert not loaded
+
+
+def test_lazy_subpackages():
+	code = "import sys, infotools; assert 'infotools.timetools' not in sys.modules; print(infotools.timetools.Timestamp.__name__)"
+	process = subprocess.run([sys.executable, '-c', code], cwd = str(ROOT), capture_output = True, text = True, check = True)
+	assert process.stdout.strip() == 'Timestamp'
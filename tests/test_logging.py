@@ -0,0 +1,72 @@
+"""
+	Suite of tests for the internal logging helpers
+"""
+import pytest
+from loguru import logger
+
+import infotools
+from infotools import _logging, numbertools
+from infotools.timetools import Timestamp
+
+
+class Message:
+	""" Records how many times it was converted to a string."""
+
+	def __init__(self):
+		self.formatted = 0
+
+	def __format__(self, spec: str) -> str:
+		self.formatted += 1
+		return 'message'
+
+
+@pytest.fixture
+def messages():
+	messages = list()
+	handler = logger.add(messages.append, level = 'DEBUG', format = "{message}")
+	infotools.reset_parse_counts()
+	yield messages
+	logger.remove(handler)
+	infotools.reset_parse_counts()
+
+
+def test_debug_disabled():
+	assert not _logging.is_debug_enabled()
+	message = Message()
+	_logging.debug("value: {}", message)
+	assert message.formatted == 0
+
+	Timestamp.parse('2019-05-06')
+	assert infotools.get_parse_counts() == {}
+
+
+def test_debug_enabled(messages):
+	assert _logging.is_debug_enabled()
+	message = Message()
+	_logging.debug("value: {}", message)
+	assert message.formatted == 1
+	assert messages[-1].record['function'] == 'test_debug_enabled'
+
+	Timestamp.from_tuple((2019, 5, 6))
+	assert messages[-1].strip() == "from_tuple((2019, 5, 6))"
+
+
+def test_parse_counts(messages):
+	Timestamp.parse('2019-05-06')
+	Timestamp.parse('2019-05-07T01:02:03')
+	Timestamp.parse('05/06/2019')
+	Timestamp.parse('May 6, 2019')
+	assert numbertools.DecimalScale().get_magnitude_from_alias('millon').prefix == 'mega'
+	assert infotools.get_parse_counts() == {'pendulum': 2, 'american': 1, 'verbal': 1, 'fuzzy alias': 1}
+
+
+def test_debug_without_loguru_internals(monkeypatch):
+	# If loguru's internals change, every message is passed to loguru, which filters them itself.
+	_logging.get_logger()
+	monkeypatch.setattr(_logging, '_core', None)
+	infotools.reset_parse_counts()
+	assert _logging.is_debug_enabled()
+	_logging.debug("value: {}", Message())
+	Timestamp.parse('2019-05-06')
+	assert infotools.get_parse_counts() == {'pendulum': 1}
+	infotools.reset_parse_counts()
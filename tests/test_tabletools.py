@@ -1,5 +1,12 @@
+import bz2
+import gzip
+import lzma
+import zipfile
 from pathlib import Path
 
+import pandas
+import pytest
+
 from infotools import tabletools
 
 folder_data = Path(__file__).parent / "data"
@@ -14,3 +21,353 @@ def test_read_table():
 
 	for filename in filenames:
 		tabletools.read_table(filename)
+
+
+@pytest.fixture
+def table() -> pandas.DataFrame:
+	data = {
+		'name':  [f"row{i}" for i in range(25)],
+		'value': list(range(25)),
+		'ratio': [i / 4 for i in range(25)]
+	}
+	return pandas.DataFrame(data)
+
+
+@pytest.mark.parametrize("extension", ['.csv', '.tsv', '.pkl', '.xlsx'])
+def test_iter_table(tmp_path, table, extension):
+	filename = tmp_path / f"table{extension}"
+	if extension == '.pkl':
+		table.to_pickle(filename)
+	elif extension == '.xlsx':
+		pytest.importorskip('openpyxl')
+		table.to_excel(filename, index = False)
+	else:
+		table.to_csv(filename, sep = ',' if extension == '.csv' else '\t', index = False)
+
+	chunks = list(tabletools.read_table(filename, chunksize = 10))
+	assert [len(i) for i in chunks] == [10, 10, 5]
+	result = pandas.concat(chunks, ignore_index = True)
+	pandas.testing.assert_frame_equal(result, table)
+
+
+def test_read_table_cache(tmp_path, table):
+	pytest.importorskip('pyarrow')
+	filename = tmp_path / "table.csv"
+	table.to_csv(filename, index = False)
+	cache = tabletools.TableCache(tmp_path / "cache")
+
+	first = tabletools.read_table(filename, cache = cache)
+	second = tabletools.read_table(filename, cache = cache)
+	indexed = tabletools.read_table(filename, cache = cache, index_col = 'name')
+	assert (cache.statistics.hits, cache.statistics.misses) == (1, 2)
+	pandas.testing.assert_frame_equal(first, table)
+	pandas.testing.assert_frame_equal(second, table)
+	pandas.testing.assert_frame_equal(tabletools.read_table(filename, cache = cache, index_col = 'name'), indexed)
+
+	# Modifying the file should invalidate the cached table.
+	table.iloc[:5].to_csv(filename, index = False)
+	assert len(tabletools.read_table(filename, cache = cache)) == 5
+	assert cache.statistics.misses == 3
+
+	cache.invalidate(filename)
+	assert cache.size() == 0
+	cache.max_size = 0
+	tabletools.read_table(filename, cache = cache)
+	assert cache.statistics.evictions == 1
+
+
+@pytest.mark.parametrize("sample_rows", [10, 1000])
+def test_read_table_optimize_memory(tmp_path, sample_rows):
+	data = {
+		'small':    [i % 100 for i in range(500)],
+		'negative': [-i for i in range(500)],
+		'large':    [i * 1000 for i in range(500)],
+		'category': [['a', 'b', 'c'][i % 3] for i in range(500)],
+		'unique':   [f"row{i}" for i in range(500)],
+		'ratio':    [i / 3 for i in range(500)]
+	}
+	table = pandas.DataFrame(data)
+	filename = tmp_path / "table.tsv"
+	table.to_csv(filename, sep = '\t', index = False)
+
+	result = tabletools.read_optimized(pandas.read_table, str(filename), sample_rows = sample_rows)
+	assert result['small'].dtype == 'uint8'
+	assert result['negative'].dtype == 'int16'
+	# The sample of 10 rows would fit in a uint16, but the full column doesn't.
+	assert result['large'].dtype == 'uint32'
+	assert result['category'].dtype == 'category'
+	assert result['unique'].dtype != 'category'
+	assert result['ratio'].dtype == 'float64'
+	assert result.attrs['memory_usage']['optimized'] < result.attrs['memory_usage']['default']
+	assert result.attrs['memory_usage']['estimated'] == (sample_rows < len(table))
+	pandas.testing.assert_frame_equal(result, table, check_dtype = False, check_categorical = False)
+
+	result = tabletools.read_optimized(pandas.read_table, str(filename), sample_rows = sample_rows, nrows = 50)
+	pandas.testing.assert_frame_equal(result, table.iloc[:50], check_dtype = False, check_categorical = False)
+	assert result['large'].dtype == 'uint16'
+
+	result = tabletools.read_table(filename, optimize_memory = True, dtype = {'small': 'int64'})
+	assert result['small'].dtype == 'int64'
+	assert result['category'].dtype == 'category'
+
+
+def test_read_table_optimize_memory_late_values(tmp_path):
+	table = pandas.DataFrame({'code': [str(i) for i in range(30)], 'count': list(range(30))})
+	table.loc[25, 'code'] = 'late note'
+	filename = tmp_path / "table.csv"
+	table.to_csv(filename, index = False)
+
+	result = tabletools.read_optimized(pandas.read_csv, str(filename), sample_rows = 10)
+	assert result['code'].tolist() == table['code'].tolist()
+	assert result['count'].dtype == 'uint8'
+
+
+@pytest.mark.parametrize("extension", ['.csv', '.pkl', '.xlsx', '.parquet'])
+def test_read_table_columns_where(tmp_path, table, extension):
+	filename = tmp_path / f"table{extension}"
+	if extension == '.pkl':
+		table.to_pickle(filename)
+	elif extension == '.parquet':
+		pytest.importorskip('pyarrow')
+		table.to_parquet(filename)
+	elif extension == '.xlsx':
+		pytest.importorskip('openpyxl')
+		table.to_excel(filename, index = False)
+	else:
+		table.to_csv(filename, index = False)
+	expected = table[table['value'] % 4 == 0][['ratio', 'name']]
+
+	result = tabletools.read_table(filename, columns = ['ratio', 'name'])
+	pandas.testing.assert_frame_equal(result, table[['ratio', 'name']])
+
+	result = tabletools.read_table(filename, columns = ['ratio', 'name'], where = lambda df: df['ratio'] % 1 == 0)
+	pandas.testing.assert_frame_equal(result, expected)
+
+	chunks = list(tabletools.iter_table(filename, chunksize = 10, where = "ratio % 1 == 0", columns = ['ratio', 'name']))
+	assert [len(i) for i in chunks] == [3, 2, 2]
+	assert all(list(i.columns) == ['ratio', 'name'] for i in chunks)
+	pandas.testing.assert_frame_equal(pandas.concat(chunks), expected)
+
+	# `where` can use columns that aren't selected.
+	expected = table[table['value'] % 4 == 0][['name']]
+	result = tabletools.read_table(filename, columns = ['name'], where = "value % 4 == 0 and `ratio` >= 0")
+	pandas.testing.assert_frame_equal(result, expected)
+	result = tabletools.read_table(filename, columns = ['name'], where = lambda df: df['value'] % 4 == 0)
+	pandas.testing.assert_frame_equal(result, expected)
+
+	# Empty results keep their dtypes.
+	result = tabletools.read_table(filename, columns = ['ratio', 'value'], where = "value > 100")
+	assert result.empty
+	assert list(result.dtypes) == list(table[['ratio', 'value']].dtypes)
+
+
+def test_read_table_where_options(tmp_path, table):
+	filename = tmp_path / "table.csv"
+	table.to_csv(filename, index = False)
+	result = tabletools.read_table(filename, where = "value < 20", optimize_memory = True)
+	pandas.testing.assert_frame_equal(result, table[table['value'] < 20], check_dtype = False)
+	assert result['value'].dtype == 'uint8'
+	assert result.attrs['memory_usage']['optimized'] < result.attrs['memory_usage']['default']
+
+	pytest.importorskip('pyarrow')
+	cache = tabletools.TableCache(tmp_path / "cache")
+	with pytest.raises(ValueError):
+		tabletools.read_table(filename, cache = cache, where = lambda df: df['value'] < 20)
+	tabletools.read_table(filename, cache = cache, where = "value < 20")
+	tabletools.read_table(filename, cache = cache, where = "value < 20")
+	assert (cache.statistics.hits, cache.statistics.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_tables(tmp_path, table, workers):
+	filenames = list()
+	for index, start in enumerate([0, 10, 20]):
+		filename = tmp_path / f"part{index}.tsv"
+		table.iloc[start:start + 10].to_csv(filename, sep = '\t', index = False)
+		filenames.append(filename)
+
+	result = tabletools.read_tables(str(tmp_path / "*.tsv"), workers = workers, source = 'filename')
+	assert result['filename'].dtype == 'category'
+	assert result['filename'].tolist() == [str(i) for i in filenames for _ in range(10)][:25]
+	pandas.testing.assert_frame_equal(result.drop(columns = 'filename'), table)
+
+	# Explicit filenames should keep their order.
+	result = tabletools.read_tables(filenames[::-1], workers = workers)
+	assert result['value'].tolist()[:5] == [20, 21, 22, 23, 24]
+
+	assert sorted(i for i, _ in tabletools.iter_tables(filenames, workers = workers)) == filenames
+
+
+@pytest.mark.parametrize("quoted", [False, True])
+def test_read_table_parallel(tmp_path, quoted):
+	data = {
+		'name':  [f"row\n{i}" if quoted and i % 7 == 0 else f"row{i}" for i in range(500)],
+		'value': [None if i == 300 else i for i in range(500)],
+		'ratio': [i / 4 for i in range(500)]
+	}
+	table = pandas.DataFrame(data)
+	filename = tmp_path / "table.csv"
+	table.to_csv(filename, index = False)
+
+	result = tabletools.read_table_parallel(filename, workers = 2, chunk_size = 1000, quoted = quoted)
+	pandas.testing.assert_frame_equal(result, tabletools.read_table(filename))
+
+
+def test_read_table_parallel_missing_sample(tmp_path):
+	# The column is empty in the rows used to infer the dtypes.
+	notes = [None] * 15000 + ['late note'] * 100
+	table = pandas.DataFrame({'value': range(len(notes)), 'notes': notes})
+	filename = tmp_path / "table.csv"
+	table.to_csv(filename, index = False)
+
+	result = tabletools.read_table_parallel(filename, workers = 2, chunk_size = 20000)
+	pandas.testing.assert_frame_equal(result, tabletools.read_table(filename))
+	assert result['notes'].iloc[-1] == 'late note'
+
+
+def test_read_table_parallel_header(tmp_path, table):
+	filename = tmp_path / "table.csv"
+	table.to_csv(filename, index = False, header = False)
+	expected = tabletools.read_table(filename, header = None)
+	result = tabletools.read_table_parallel(filename, workers = 2, chunk_size = 100, header = None)
+	pandas.testing.assert_frame_equal(result, expected)
+	assert len(result) == len(table)
+
+	names = list(table.columns)
+	result = tabletools.read_table_parallel(filename, workers = 2, chunk_size = 100, names = names)
+	pandas.testing.assert_frame_equal(result, table)
+
+	for kwargs in [{'skiprows': 1}, {'header': 1}, {'nrows': 10}]:
+		with pytest.raises(ValueError):
+			tabletools.read_table_parallel(filename, **kwargs)
+
+
+@pytest.mark.parametrize(
+	"name, compress",
+	[
+		("table.csv.gz", gzip.compress),
+		("table.tsv.bz2", bz2.compress),
+		("table.txt.xz", lzma.compress),
+		("table.pkl.gz", gzip.compress),
+		# Compressed without changing the extension.
+		("table.tsv", gzip.compress)
+	]
+)
+def test_read_table_compressed(tmp_path, table, name, compress):
+	filename = tmp_path / name
+	if '.pkl' in name:
+		table.to_pickle(tmp_path / "uncompressed")
+		data = (tmp_path / "uncompressed").read_bytes()
+	else:
+		data = table.to_csv(sep = ',' if '.csv' in name else '\t', index = False).encode()
+	filename.write_bytes(compress(data))
+
+	# .txt files don't have a default delimiter.
+	kwargs = {'sep': '\t'} if '.txt' in name else {}
+	pandas.testing.assert_frame_equal(tabletools.read_table(filename, **kwargs), table)
+	chunks = list(tabletools.iter_table(filename, chunksize = 10, **kwargs))
+	pandas.testing.assert_frame_equal(pandas.concat(chunks), table)
+
+
+def test_read_table_zip(tmp_path, table):
+	filename = tmp_path / "table.csv.zip"
+	with zipfile.ZipFile(filename, 'w') as archive:
+		archive.writestr("table.csv", table.to_csv(index = False))
+	pandas.testing.assert_frame_equal(tabletools.read_table(filename, optimize_memory = True), table, check_dtype = False)
+
+
+@pytest.mark.parametrize(
+	"name, contents, expected",
+	[
+		("table.txt", "name;value\nabc;1\ndef;2\n", tabletools.TextFormat(';', '"', True, 'utf-8')),
+		("table.txt", "abc|1\ndef|2\nghi|3\n", tabletools.TextFormat('|', '"', False, 'utf-8')),
+		# Mislabelled as comma-separated.
+		("table.csv", "name\tvalue\nabc\t1\ndef\t2\n", tabletools.TextFormat('\t', '"', True, 'utf-8'))
+	]
+)
+def test_sniff_format(tmp_path, name, contents, expected):
+	filename = tmp_path / name
+	filename.write_text(contents)
+	assert tabletools.sniff_format(filename, expected_delimiter = ',' if name.endswith('.csv') else None) == expected
+
+	result = tabletools.read_table(filename)
+	assert result.shape == (3 - expected.header, 2)
+
+
+def test_read_table_sniffed_encoding(tmp_path):
+	filename = tmp_path / "table.fsv"
+	filename.write_bytes("name,city\nabc,Zürich\ndef,Köln\n".encode('latin-1'))
+	assert tabletools.sniff_format(filename).encoding == 'latin-1'
+	assert tabletools.read_table(filename)['city'].tolist() == ['Zürich', 'Köln']
+
+
+def test_read_table_single_quotes(tmp_path):
+	# Extensions that imply a delimiter keep pandas' default quoting.
+	filename = tmp_path / "table.csv"
+	filename.write_text("id,text\n1,'a' or 'b'\n2,'c'\n3,'d'\n")
+	assert tabletools.read_table(filename)['text'].tolist() == ["'a' or 'b'", "'c'", "'d'"]
+	result = tabletools.read_table(filename, quotechar = "'")
+	assert result['text'].tolist() == ["a or 'b'", "c", "d"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_to_spreadsheet_streaming(tmp_path, table, workers):
+	pytest.importorskip('openpyxl')
+	table['date'] = pandas.date_range("2019-05-06", periods = len(table), freq = 'h')
+	table['flag'] = table['value'] % 2 == 0
+	table.loc[3, 'ratio'] = None
+	table.loc[4, 'name'] = "<a & b>"
+	filename = tmp_path / "tables.xlsx"
+
+	def chunks():
+		for start in range(0, len(table), 10):
+			yield table.iloc[start:start + 10]
+
+	tabletools.to_spreadsheet({'first': table, 'second': chunks(), 'skipped': None}, filename, streaming = True, workers = workers)
+	sheets = pandas.read_excel(filename, sheet_name = None)
+	assert list(sheets) == ['first', 'second']
+	for sheet in sheets.values():
+		pandas.testing.assert_frame_equal(sheet, table, check_dtype = False)
+
+
+def test_to_spreadsheet(tmp_path, table):
+	pytest.importorskip('openpyxl')
+	filename = tmp_path / "tables.xlsx"
+	tabletools.to_spreadsheet({'first': table}, filename)
+	pandas.testing.assert_frame_equal(pandas.read_excel(filename), table)
+
+
+@pytest.mark.parametrize(
+	"name", ["table.csv", "table.tsv", "table.pkl", "table.csv.gz", "table.tsv.bz2", "table.csv.xz", "table.pkl.gz", "table.csv.zip"]
+)
+@pytest.mark.parametrize("threaded", [False, True])
+def test_write_table(tmp_path, table, name, threaded):
+	filename = tmp_path / name
+	result = tabletools.write_table(table, filename, chunksize = 10, threaded = threaded)
+	assert result.rows == len(table)
+	assert result.size == filename.stat().st_size
+	assert result.throughput > 0
+	pandas.testing.assert_frame_equal(tabletools.read_table(filename), table)
+
+
+@pytest.mark.parametrize("name", ["table.parquet", "table.feather"])
+def test_write_table_binary(tmp_path, table, name):
+	pytest.importorskip('pyarrow')
+	filename = tmp_path / name
+	tabletools.write_table(table, filename)
+	pandas.testing.assert_frame_equal(tabletools.read_table(filename), table)
+	pandas.testing.assert_frame_equal(tabletools.read_table(filename, columns = ['ratio', 'name']), table[['ratio', 'name']])
+	chunks = list(tabletools.iter_table(filename, chunksize = 10, where = lambda df: df['value'] > 20))
+	pandas.testing.assert_frame_equal(pandas.concat(chunks), table[table['value'] > 20])
+
+
+def test_write_table_header(tmp_path, table):
+	filename = tmp_path / "table.csv"
+	tabletools.write_table(table, filename, chunksize = 10, header = False)
+	result = tabletools.read_table(filename, header = None, names = list(table.columns))
+	pandas.testing.assert_frame_equal(result, table)
+
+	tabletools.write_table(table, filename, chunksize = 10, header = ['a', 'b', 'c'], sep = ';')
+	result = tabletools.read_table(filename, sep = ';')
+	assert list(result.columns) == ['a', 'b', 'c']
+	assert len(result) == len(table)
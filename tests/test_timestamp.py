@@ -2,6 +2,7 @@
 	A suite of tests to ensure timetools.Timestamp is operating properly.
 """
 import datetime
+import pickle
 
 import pandas
 import pendulum
@@ -83,4 +84,32 @@ def test_misc(value, expected):
 def test_to_datetime(string, expected):
 	# '2016-11-16 22:32:05'
 	result = timetools.Timestamp(string).to_datetime()
-	assert result == expected
\ No newline at end of file
+	assert result == expected
+
+def test_timestamp_pickle():
+	values = [
+		timetools.Timestamp(2019, 5, 6, 1, 2, 3, 456789),
+		timetools.Timestamp.from_epoch(1572762600 * 10 ** 6, 'America/New_York'),
+		timetools.Timestamp.from_epoch(0, '+05:30')
+	]
+	for value in values:
+		result = pickle.loads(pickle.dumps(value))
+		assert isinstance(result, timetools.Timestamp)
+		assert result.isoformat() == value.isoformat()
+		assert result.to_epoch() == value.to_epoch()
+	assert values[1].isoformat() == '2019-11-03T01:30:00-05:00'
+
+
+def test_pack_timestamps():
+	values = [
+		timetools.Timestamp(2019, 5, 6, 1, 2, 3, 456789),
+		None,
+		timetools.Timestamp.from_epoch(-10 ** 12, 'Europe/Berlin'),
+		timetools.Timestamp.from_epoch(10 ** 15, 'America/New_York')
+	]
+	data = timetools.pack_timestamps(values)
+	assert len(data) % 8 == 0
+	# Extra bytes after the data are ignored, since shared memory is rounded up to the page size.
+	result = timetools.unpack_timestamps(memoryview(bytearray(data + b'\0' * 64)))
+	assert result[1] is None
+	assert [i.isoformat() if i else None for i in result] == [i.isoformat() if i else None for i in values]